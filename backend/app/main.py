@@ -3,9 +3,11 @@ Voronoi Population Mapping API - FastAPI Application
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.responses import ORJSONResponse
 
 from app.routers import voronoi, upload, boundaries, population, dcel, chat, area_rating, routing
 from contextlib import asynccontextmanager
+import asyncio
 import threading
 from pathlib import Path
 
@@ -25,13 +27,20 @@ async def lifespan(app: FastAPI):
 
     thread = threading.Thread(target=precompute_heatmaps, daemon=True)
     thread.start()
+
+    # Open OSRM connections in the background so startup isn't blocked
+    # when the routing server is down
+    from app.services.routing_service import get_routing_service
+    warmup_task = asyncio.create_task(get_routing_service().warmup())
     yield
+    warmup_task.cancel()
 
 app = FastAPI(
     title="Voronoi Population Mapping API",
     description="Compute Voronoi diagrams for facilities and weighted population estimates",
     version="0.2.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Ensure data directories exist
@@ -0,0 +1,21 @@
+"""
+Response classes shared by the routers.
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response encoded with orjson.
+    
+    Several times faster than stdlib json on the large GeoJSON payloads, and
+    numpy scalars/arrays serialize without converting them first.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
@@ -1,10 +1,12 @@
 """
 Boundaries router - serves administrative boundary GeoJSON data
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel
 from typing import Optional
+from functools import lru_cache
 import geopandas as gpd
+import orjson
 from shapely.ops import unary_union
 from shapely.geometry import mapping
 import os
@@ -85,13 +87,19 @@ def _load_india_boundary():
         }
 
 
+@lru_cache(maxsize=1)
+def _india_boundary_json() -> bytes:
+    """India boundary Feature, encoded once."""
+    return orjson.dumps(_load_india_boundary())
+
+
 @router.get("/india")
 async def get_india_boundary():
     """
     Get simplified India boundary for map display.
     Returns a GeoJSON Feature with India's boundary.
     """
-    return _load_india_boundary()
+    return Response(content=_india_boundary_json(), media_type="application/json")
 
 
 # Cache for states GeoDataFrame
@@ -123,6 +131,23 @@ def _load_states_gdf():
         return None
 
 
+@lru_cache(maxsize=64)
+def _state_boundary_json(state_name: str) -> Optional[bytes]:
+    """Encoded GeoJSON Feature for a state (lowercase name), or None if unknown."""
+    gdf = _load_states_gdf()
+    state_gdf = gdf[gdf['state'].str.lower() == state_name]
+    
+    if len(state_gdf) == 0:
+        return None
+    
+    state_row = state_gdf.iloc[0]
+    return orjson.dumps({
+        "type": "Feature",
+        "properties": {"name": state_row['state']},
+        "geometry": mapping(state_row.geometry)
+    })
+
+
 @router.get("/states/list")
 async def get_states_list():
     """
@@ -149,18 +174,12 @@ async def get_state_boundary(state_name: str):
         raise HTTPException(status_code=404, detail="States data not found")
     
     # Find the state (case-insensitive match)
-    state_gdf = gdf[gdf['state'].str.lower() == state_name.lower()]
+    content = _state_boundary_json(state_name.lower())
     
-    if len(state_gdf) == 0:
+    if content is None:
         raise HTTPException(status_code=404, detail=f"State '{state_name}' not found")
     
-    # Return as GeoJSON Feature
-    state_row = state_gdf.iloc[0]
-    return {
-        "type": "Feature",
-        "properties": {"name": state_row['state']},
-        "geometry": mapping(state_row.geometry)
-    }
+    return Response(content=content, media_type="application/json")
 
 
 @router.get("/{level}")
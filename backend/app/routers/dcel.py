@@ -1,9 +1,9 @@
 """
 DCEL router - API endpoints for DCEL spatial queries.
 """
-from typing import Optional
+from typing import Any, Dict, List, Literal, Optional
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 
 from app.services.dcel import get_current_dcel
 
@@ -40,7 +40,18 @@ class TopFacilitiesRequest(BaseModel):
     state: Optional[str] = None
 
 
-@router.post("/query-point", response_model=PointQueryResponse)
+class BatchOperation(BaseModel):
+    """One sub-request of a batch, named after the endpoint it stands for."""
+    op: Literal["query_point", "range_query", "top_by_population", "adjacent", "summary"]
+    args: Dict[str, Any] = Field(default_factory=dict)
+
+
+class BatchRequest(BaseModel):
+    """Several DCEL queries answered in one round trip."""
+    ops: List[BatchOperation] = Field(..., max_length=100)
+
+
+@router.post("/query-point", responses={200: {"model": PointQueryResponse}})
 async def query_point(request: PointQueryRequest):
     """
     Find which facility serves a given location.
@@ -183,3 +194,38 @@ async def get_dcel_summary():
         "available": True,
         "data": dcel.to_dict()
     }
+
+
+async def _run_batch_operation(operation: BatchOperation):
+    """Dispatch one batch operation to its endpoint handler in-process."""
+    args = operation.args
+    if operation.op == "query_point":
+        return (await query_point(PointQueryRequest(**args))).model_dump()
+    if operation.op == "range_query":
+        return await range_query(RangeQueryRequest(**args))
+    if operation.op == "top_by_population":
+        return await get_top_by_population(TopFacilitiesRequest(**args))
+    if operation.op == "adjacent":
+        return await get_adjacent_facilities(str(args["facility_id"]))
+    return await get_dcel_summary()
+
+
+@router.post("/batch")
+async def batch(request: BatchRequest):
+    """
+    Run several DCEL queries in one request.
+    
+    Each operation gets its own status code, so one failing query (e.g. an
+    unknown facility) doesn't fail the rest.
+    """
+    results = []
+    for operation in request.ops:
+        try:
+            data = await _run_batch_operation(operation)
+            results.append({"op": operation.op, "status_code": 200, "data": data})
+        except HTTPException as e:
+            results.append({"op": operation.op, "status_code": e.status_code, "detail": e.detail})
+        except (ValidationError, KeyError) as e:
+            results.append({"op": operation.op, "status_code": 422, "detail": str(e)})
+    
+    return {"count": len(results), "results": results}
@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import List, Optional
 from fastapi import APIRouter, HTTPException, UploadFile, File
 from pydantic import BaseModel
+import httpx
 import pandas as pd
 
 router = APIRouter()
@@ -36,6 +37,18 @@ class UploadResponse(BaseModel):
     errors: List[str]
 
 
+# Shared Overpass client so repeated bus stop lookups reuse the connection
+_overpass_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_overpass_client() -> httpx.AsyncClient:
+    """Get or create the Overpass API client."""
+    global _overpass_client
+    if _overpass_client is None:
+        _overpass_client = httpx.AsyncClient(timeout=90)
+    return _overpass_client
+
+
 # India bounding box (approximate)
 INDIA_BOUNDS = {
     "min_lat": 6.5,
@@ -45,7 +58,7 @@ INDIA_BOUNDS = {
 }
 
 
-@router.post("/csv", response_model=UploadResponse)
+@router.post("/csv", responses={200: {"model": UploadResponse}})
 async def upload_csv(file: UploadFile = File(...)):
     """
     Upload a CSV file with facility coordinates.
@@ -176,7 +189,7 @@ async def upload_raw_csv(file: UploadFile = File(...)):
     }
 
 
-@router.get("/sample-data", response_model=UploadResponse)
+@router.get("/sample-data", responses={200: {"model": UploadResponse}})
 async def get_sample_data():
     """
     Load sample test.csv from the data folder.
@@ -269,7 +282,7 @@ async def get_available_files():
     return result
 
 
-@router.get("/load-file/{filename}", response_model=UploadResponse)
+@router.get("/load-file/{filename}", responses={200: {"model": UploadResponse}})
 async def load_file(filename: str):
     """
     Load a specific CSV file from the data folder.
@@ -336,7 +349,7 @@ async def load_file(filename: str):
     )
 
 
-@router.get("/load-public-file/{filename}", response_model=UploadResponse)
+@router.get("/load-public-file/{filename}", responses={200: {"model": UploadResponse}})
 async def load_public_file(filename: str):
     """
     Load a public facility CSV file from the data/public folder.
@@ -405,14 +418,12 @@ async def load_public_file(filename: str):
     )
 
 
-@router.get("/bus-stops/{state_name}", response_model=UploadResponse)
+@router.get("/bus-stops/{state_name}", responses={200: {"model": UploadResponse}})
 async def get_bus_stops_for_state(state_name: str):
     """
     Dynamically fetch bus stops for a specific state from OpenStreetMap.
     This is only available when filtering by state to avoid overwhelming data.
     """
-    import requests
-    
     # Validate state name
     if not state_name or len(state_name) < 2:
         raise HTTPException(status_code=400, detail="Invalid state name")
@@ -428,10 +439,10 @@ async def get_bus_stops_for_state(state_name: str):
     """
     
     try:
-        response = requests.post(
+        client = _get_overpass_client()
+        response = await client.post(
             "https://overpass-api.de/api/interpreter",
-            data={"data": query},
-            timeout=90
+            data={"data": query}
         )
         response.raise_for_status()
         result = response.json()
@@ -2,7 +2,10 @@
 Voronoi computation router - handles Voronoi diagram API endpoints
 """
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException
+from functools import lru_cache
+import orjson
+from fastapi import APIRouter, HTTPException, Response
+from app.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 
 from app.services.voronoi_engine import VoronoiEngine
@@ -35,7 +38,7 @@ class VoronoiResponse(BaseModel):
     features: List[dict]
 
 
-@router.post("/compute", response_model=VoronoiResponse)
+@router.post("/compute", responses={200: {"model": VoronoiResponse}})
 async def compute_voronoi(request: VoronoiRequest):
     """
     Compute Voronoi diagram for given facility coordinates.
@@ -79,29 +82,59 @@ async def compute_voronoi(request: VoronoiRequest):
                     feature['properties']['population'] = match['total_population']
                     feature['properties']['population_breakdown'] = match['breakdown']
         
-        return VoronoiResponse(**geojson)
+        # The engine already builds valid GeoJSON, so skip response validation
+        return ORJSONResponse(content=geojson)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+SAMPLE_FACILITIES = [
+    Facility(id="1", name="Delhi", lat=28.6139, lng=77.2090, type="city"),
+    Facility(id="2", name="Mumbai", lat=19.0760, lng=72.8777, type="city"),
+    Facility(id="3", name="Chennai", lat=13.0827, lng=80.2707, type="city"),
+    Facility(id="4", name="Kolkata", lat=22.5726, lng=88.3639, type="city"),
+    Facility(id="5", name="Bangalore", lat=12.9716, lng=77.5946, type="city"),
+    Facility(id="6", name="Hyderabad", lat=17.3850, lng=78.4867, type="city"),
+]
+
+
+def _compute_sample_voronoi():
+    """
+    Sample cells and a new DCEL, which becomes the current one. The engine's
+    cell cache makes repeat calls cheap, and each gets its own GeoJSON and
+    DCEL, so nothing a request does to them reaches the next one.
+    """
+    return VoronoiEngine().compute_voronoi_with_dcel(
+        coords=[(f.lng, f.lat) for f in SAMPLE_FACILITIES],
+        names=[f.name for f in SAMPLE_FACILITIES],
+        facility_ids=[f.id for f in SAMPLE_FACILITIES],
+        types=[f.type for f in SAMPLE_FACILITIES],
+        clip_to_india=True
+    )
+
+
+@lru_cache(maxsize=1)
+def _sample_voronoi_json() -> bytes:
+    """The sample diagram never changes, so encode it once."""
+    geojson, _ = _compute_sample_voronoi()
+    return orjson.dumps(geojson, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
 @router.get("/sample")
 async def get_sample_voronoi():
     """
     Return a sample Voronoi diagram for testing.
     Uses hardcoded coordinates of major Indian cities.
     """
-    sample_facilities = [
-        Facility(id="1", name="Delhi", lat=28.6139, lng=77.2090, type="city"),
-        Facility(id="2", name="Mumbai", lat=19.0760, lng=72.8777, type="city"),
-        Facility(id="3", name="Chennai", lat=13.0827, lng=80.2707, type="city"),
-        Facility(id="4", name="Kolkata", lat=22.5726, lng=88.3639, type="city"),
-        Facility(id="5", name="Bangalore", lat=12.9716, lng=77.5946, type="city"),
-        Facility(id="6", name="Hyderabad", lat=17.3850, lng=78.4867, type="city"),
-    ]
+    try:
+        content = _sample_voronoi_json()
+        # Spatial queries after loading the sample should run against it
+        _compute_sample_voronoi()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
     
-    request = VoronoiRequest(facilities=sample_facilities, clip_to_india=True)
-    return await compute_voronoi(request)
+    return Response(content=content, media_type="application/json")
 
 
 @router.post("/insights")
@@ -643,7 +676,7 @@ async def compute_weighted_road_voronoi(request: WeightedRoadVoronoiRequest):
         ]
         
         engine = get_weighted_voronoi_engine()
-        result = engine.compute(
+        result = await engine.compute_async(
             facilities=facilities,
             clip_to_india=request.clip_to_india,
             state_filter=request.state_filter,
@@ -5,6 +5,15 @@ from pathlib import Path
 from typing import Dict, List, Optional, Any
 
 class AugmentationService:
+    @staticmethod
+    def _read_csv_strings(path: Path, sep: str, header: Optional[str] = 'infer') -> pd.DataFrame:
+        """
+        Read a whole CSV as strings with the C parser, which is several times
+        faster than the python engine on large uploads. Unlike the pyarrow
+        engine it keeps the text as written ('001', '28.50').
+        """
+        return pd.read_csv(path, dtype=str, header=header, sep=sep, engine='c')
+
     @staticmethod
     def analyze_csv(file_path: Path) -> Dict[str, Any]:
         """
@@ -160,7 +169,7 @@ class AugmentationService:
                 continue
         
         # 2. Initial load
-        df = pd.read_csv(input_path, dtype=str, sep=best_sep, engine='python')
+        df = AugmentationService._read_csv_strings(input_path, best_sep)
         
         # Detect and fix headerless data
         unnamed_count = sum(1 for col in df.columns if str(col).strip().startswith('Unnamed:'))
@@ -174,7 +183,7 @@ class AugmentationService:
         is_headerless = (unnamed_count >= len(df.columns) / 2) or has_data_in_header
         
         if is_headerless:
-            df = pd.read_csv(input_path, dtype=str, header=None, sep=best_sep, engine='python')
+            df = AugmentationService._read_csv_strings(input_path, best_sep, header=None)
             # Drop empty first rows
             while not df.empty:
                 first_row = df.iloc[0].astype(str).str.strip()
@@ -0,0 +1,18 @@
+"""
+Locations of the on-disk caches.
+"""
+import os
+
+
+def cache_dir(*parts: str) -> str:
+    """
+    Directory for a persistent cache, kept outside the source tree.
+    
+    $TESSERA_CACHE_DIR if set, otherwise tessera/ under the user cache
+    directory ($XDG_CACHE_HOME, or ~/.cache).
+    """
+    base = os.environ.get("TESSERA_CACHE_DIR")
+    if not base:
+        user_cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        base = os.path.join(user_cache, "tessera")
+    return os.path.join(base, *parts)
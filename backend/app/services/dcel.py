@@ -2,7 +2,7 @@
 DCEL (Doubly-Connected Edge List) data structure for spatial indexing of Voronoi diagrams.
 Enables fast point-in-polygon queries and spatial relationships.
 """
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Sequence
 from dataclasses import dataclass, field
 from shapely.geometry import Point, Polygon, MultiPolygon, box
 from shapely.strtree import STRtree
@@ -57,20 +57,28 @@ class DCEL:
         self._face_lookup: Dict[str, DCELFace] = {}
         self._geometry_to_face: Dict[int, DCELFace] = {}
     
-    def build_from_voronoi(self, voronoi_geojson: Dict) -> None:
+    def build_from_voronoi(
+        self,
+        voronoi_geojson: Dict,
+        polygons: Optional[Sequence[Polygon]] = None
+    ) -> None:
         """
         Build DCEL from Voronoi diagram GeoJSON.
         
         Args:
             voronoi_geojson: GeoJSON FeatureCollection from VoronoiEngine
+            polygons: Optional cell polygons aligned with the features; when
+                given, the GeoJSON geometries are not re-parsed
         """
         features = voronoi_geojson.get('features', [])
         
         for idx, feature in enumerate(features):
-            geometry = feature['geometry']
             properties = feature['properties']
             
-            polygon = self._geojson_to_polygon(geometry)
+            if polygons is not None:
+                polygon = polygons[idx]
+            else:
+                polygon = self._geojson_to_polygon(feature['geometry'])
             
             face = DCELFace(
                 id=idx,
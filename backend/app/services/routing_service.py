@@ -7,14 +7,23 @@ Uses OSRM (Open Source Routing Machine) for fast, accurate road network routing.
 
 import httpx
 import asyncio
+import importlib.util
+import os
+import sqlite3
+import struct
+import numpy as np
+import threading
+from collections import OrderedDict
 from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import logging
 
+from .cache_paths import cache_dir
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RouteResult:
     """Result of a single route query."""
     origin: Tuple[float, float]  # (lat, lng)
@@ -25,6 +34,100 @@ class RouteResult:
     error: Optional[str] = None
 
 
+class RoadDistanceCache:
+    """
+    Persistent store of road distances, shared across runs and processes.
+    
+    Road distances are deterministic for a given road graph, so a pair that
+    was routed once never needs OSRM again. Keys are the origin/destination
+    coordinates quantized to 1e-5 degrees (~1 m) plus a version number;
+    bumping the version (e.g. after an OSRM data update) ignores old rows.
+    Only connected results are stored, since failures may be transient.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(cache_dir("routing"), "road_distances.sqlite")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS road_distance "
+                "(key BLOB PRIMARY KEY, distance_km REAL, duration_min REAL)"
+            )
+        return self._conn
+    
+    @staticmethod
+    def _key(version: int, origin: Tuple[float, float], dest: Tuple[float, float]) -> bytes:
+        return struct.pack(">iiiii", version, *[round(v * 1e5) for v in (*origin, *dest)])
+    
+    def get_many(
+        self,
+        version: int,
+        origin: Tuple[float, float],
+        destinations: List[Tuple[float, float]]
+    ) -> List[Optional[RouteResult]]:
+        """Cached result per destination, or None where the pair is unknown."""
+        if not destinations:
+            return []
+        keys = [self._key(version, origin, dest) for dest in destinations]
+        try:
+            with self._lock:
+                rows = self._connect().execute(
+                    f"SELECT key, distance_km, duration_min FROM road_distance "
+                    f"WHERE key IN ({','.join('?' * len(keys))})",
+                    keys
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Road distance cache read failed: {e}")
+            return [None] * len(destinations)
+        
+        found = {key: (distance_km, duration_min) for key, distance_km, duration_min in rows}
+        results = []
+        for key, dest in zip(keys, destinations):
+            if key in found:
+                distance_km, duration_min = found[key]
+                results.append(RouteResult(
+                    origin=origin,
+                    destination=dest,
+                    distance_km=distance_km,
+                    duration_min=duration_min,
+                    connected=True
+                ))
+            else:
+                results.append(None)
+        return results
+    
+    def put_many(self, version: int, results: List[RouteResult]):
+        """Store the connected results."""
+        rows = [
+            (self._key(version, r.origin, r.destination), r.distance_km, r.duration_min)
+            for r in results if r.connected
+        ]
+        if not rows:
+            return
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO road_distance VALUES (?, ?, ?)", rows
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"Road distance cache write failed: {e}")
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
 @dataclass
 class RoutingConfig:
     """Configuration for the routing service."""
@@ -33,6 +136,11 @@ class RoutingConfig:
     timeout_seconds: float = 10.0
     max_retries: int = 3
     batch_size: int = 100  # Max destinations per table query
+    grid_deg: float = 1e-4  # Cache key grid (~10 m); well within OSRM snapping noise
+    cache_size: int = 100_000  # Max cached origin/destination pairs
+    max_connections: int = 64  # Pooled, kept-alive connections per client
+    http2: bool = True  # Multiplex requests over TLS when the h2 package is installed
+    distance_cache_path: Optional[str] = None  # Road distance sqlite file; default is under the user cache dir
 
 
 class RoutingService:
@@ -49,28 +157,78 @@ class RoutingService:
         self.config = config or RoutingConfig()
         self._client: Optional[httpx.AsyncClient] = None
         self._sync_client: Optional[httpx.Client] = None
+        self._cache: "OrderedDict[Tuple, RouteResult]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+    
+    def _client_options(self) -> Dict:
+        """
+        Options shared by the async and sync clients.
+        
+        Every pooled connection is kept alive, so concurrent batches reuse
+        warm connections instead of reconnecting (and re-handshaking TLS)
+        once the keep-alive pool is full. HTTP/2 is only negotiated over
+        TLS; plain-HTTP OSRM servers keep using HTTP/1.1.
+        """
+        return {
+            "timeout": self.config.timeout_seconds,
+            "limits": httpx.Limits(
+                max_connections=self.config.max_connections,
+                max_keepalive_connections=self.config.max_connections
+            ),
+            "http2": self.config.http2 and importlib.util.find_spec("h2") is not None,
+        }
     
     async def _get_async_client(self) -> httpx.AsyncClient:
         """Get or create async HTTP client."""
         if self._client is None:
-            self._client = httpx.AsyncClient(
-                timeout=self.config.timeout_seconds,
-                limits=httpx.Limits(max_connections=50, max_keepalive_connections=10)
-            )
+            self._client = httpx.AsyncClient(**self._client_options())
         return self._client
     
     def _get_sync_client(self) -> httpx.Client:
         """Get or create sync HTTP client."""
         if self._sync_client is None:
-            self._sync_client = httpx.Client(
-                timeout=self.config.timeout_seconds
-            )
+            self._sync_client = httpx.Client(**self._client_options())
         return self._sync_client
     
     def _format_coords(self, lat: float, lng: float) -> str:
         """Format coordinates for OSRM (note: OSRM uses lng,lat order)."""
         return f"{lng},{lat}"
     
+    def _cache_key(self, lat: float, lng: float) -> Tuple[int, int]:
+        """
+        Snap a coordinate to the cache grid.
+        
+        Points closer than config.grid_deg (~10 m by default) share a key, so
+        near-duplicate queries hit the cache at the cost of that much accuracy.
+        """
+        grid = self.config.grid_deg
+        return (round(lat / grid), round(lng / grid))
+    
+    def _cache_get(
+        self,
+        origin: Tuple[float, float],
+        dest: Tuple[float, float]
+    ) -> Optional[RouteResult]:
+        """Look up a cached route, re-labelled with the caller's coordinates."""
+        key = (self._cache_key(*origin), self._cache_key(*dest))
+        with self._cache_lock:
+            result = self._cache.get(key)
+            if result is None:
+                return None
+            self._cache.move_to_end(key)
+        return replace(result, origin=origin, destination=dest)
+    
+    def _cache_put(self, result: RouteResult):
+        """Cache a successful route result, evicting the oldest entries."""
+        if not result.connected:
+            return  # Failures may be transient
+        key = (self._cache_key(*result.origin), self._cache_key(*result.destination))
+        with self._cache_lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.config.cache_size:
+                self._cache.popitem(last=False)
+    
     async def get_route_distance(
         self, 
         origin_lat: float, 
@@ -88,6 +246,22 @@ class RoutingService:
         Returns:
             RouteResult with distance/duration or error
         """
+        cached = self._cache_get((origin_lat, origin_lng), (dest_lat, dest_lng))
+        if cached is not None:
+            return cached
+        
+        result = await self._fetch_route(origin_lat, origin_lng, dest_lat, dest_lng)
+        self._cache_put(result)
+        return result
+    
+    async def _fetch_route(
+        self, 
+        origin_lat: float, 
+        origin_lng: float,
+        dest_lat: float,
+        dest_lng: float
+    ) -> RouteResult:
+        """Query OSRM /route for a single pair, bypassing the cache."""
         client = await self._get_async_client()
         
         coords = f"{self._format_coords(origin_lat, origin_lng)};{self._format_coords(dest_lat, dest_lng)}"
@@ -95,29 +269,7 @@ class RoutingService:
         
         try:
             response = await client.get(url, params={"overview": "false"})
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get("code") == "Ok" and data.get("routes"):
-                route = data["routes"][0]
-                return RouteResult(
-                    origin=(origin_lat, origin_lng),
-                    destination=(dest_lat, dest_lng),
-                    distance_km=route["distance"] / 1000,  # meters to km
-                    duration_min=route["duration"] / 60,   # seconds to minutes
-                    connected=True
-                )
-            else:
-                return RouteResult(
-                    origin=(origin_lat, origin_lng),
-                    destination=(dest_lat, dest_lng),
-                    distance_km=float('inf'),
-                    duration_min=float('inf'),
-                    connected=False,
-                    error=data.get("message", "No route found")
-                )
-                
-        except httpx.HTTPError as e:
+        except (httpx.TimeoutException, httpx.TransportError) as e:
             logger.error(f"OSRM request failed: {e}")
             return RouteResult(
                 origin=(origin_lat, origin_lng),
@@ -127,6 +279,37 @@ class RoutingService:
                 connected=False,
                 error=str(e)
             )
+        
+        if response.status_code != 200:
+            return RouteResult(
+                origin=(origin_lat, origin_lng),
+                destination=(dest_lat, dest_lng),
+                distance_km=float('inf'),
+                duration_min=float('inf'),
+                connected=False,
+                error=f"HTTP {response.status_code}"
+            )
+        
+        data = response.json()
+        
+        if data.get("code") == "Ok" and data.get("routes"):
+            route = data["routes"][0]
+            return RouteResult(
+                origin=(origin_lat, origin_lng),
+                destination=(dest_lat, dest_lng),
+                distance_km=route["distance"] / 1000,  # meters to km
+                duration_min=route["duration"] / 60,   # seconds to minutes
+                connected=True
+            )
+        else:
+            return RouteResult(
+                origin=(origin_lat, origin_lng),
+                destination=(dest_lat, dest_lng),
+                distance_km=float('inf'),
+                duration_min=float('inf'),
+                connected=False,
+                error=data.get("message", "No route found")
+            )
     
     def get_route_distance_sync(
         self, 
@@ -136,6 +319,22 @@ class RoutingService:
         dest_lng: float
     ) -> RouteResult:
         """Synchronous version of get_route_distance."""
+        cached = self._cache_get((origin_lat, origin_lng), (dest_lat, dest_lng))
+        if cached is not None:
+            return cached
+        
+        result = self._fetch_route_sync(origin_lat, origin_lng, dest_lat, dest_lng)
+        self._cache_put(result)
+        return result
+    
+    def _fetch_route_sync(
+        self, 
+        origin_lat: float, 
+        origin_lng: float,
+        dest_lat: float,
+        dest_lng: float
+    ) -> RouteResult:
+        """Synchronous version of _fetch_route."""
         client = self._get_sync_client()
         
         coords = f"{self._format_coords(origin_lat, origin_lng)};{self._format_coords(dest_lat, dest_lng)}"
@@ -143,29 +342,7 @@ class RoutingService:
         
         try:
             response = client.get(url, params={"overview": "false"})
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get("code") == "Ok" and data.get("routes"):
-                route = data["routes"][0]
-                return RouteResult(
-                    origin=(origin_lat, origin_lng),
-                    destination=(dest_lat, dest_lng),
-                    distance_km=route["distance"] / 1000,
-                    duration_min=route["duration"] / 60,
-                    connected=True
-                )
-            else:
-                return RouteResult(
-                    origin=(origin_lat, origin_lng),
-                    destination=(dest_lat, dest_lng),
-                    distance_km=float('inf'),
-                    duration_min=float('inf'),
-                    connected=False,
-                    error=data.get("message", "No route found")
-                )
-                
-        except httpx.HTTPError as e:
+        except (httpx.TimeoutException, httpx.TransportError) as e:
             logger.error(f"OSRM request failed: {e}")
             return RouteResult(
                 origin=(origin_lat, origin_lng),
@@ -175,6 +352,37 @@ class RoutingService:
                 connected=False,
                 error=str(e)
             )
+        
+        if response.status_code != 200:
+            return RouteResult(
+                origin=(origin_lat, origin_lng),
+                destination=(dest_lat, dest_lng),
+                distance_km=float('inf'),
+                duration_min=float('inf'),
+                connected=False,
+                error=f"HTTP {response.status_code}"
+            )
+        
+        data = response.json()
+        
+        if data.get("code") == "Ok" and data.get("routes"):
+            route = data["routes"][0]
+            return RouteResult(
+                origin=(origin_lat, origin_lng),
+                destination=(dest_lat, dest_lng),
+                distance_km=route["distance"] / 1000,
+                duration_min=route["duration"] / 60,
+                connected=True
+            )
+        else:
+            return RouteResult(
+                origin=(origin_lat, origin_lng),
+                destination=(dest_lat, dest_lng),
+                distance_km=float('inf'),
+                duration_min=float('inf'),
+                connected=False,
+                error=data.get("message", "No route found")
+            )
     
     async def batch_distance(
         self,
@@ -197,6 +405,27 @@ class RoutingService:
         if not destinations:
             return []
         
+        origin = (origin_lat, origin_lng)
+        results = [self._cache_get(origin, dest) for dest in destinations]
+        missing = [i for i, r in enumerate(results) if r is None]
+        
+        if missing:
+            fetched = await self._fetch_table(
+                origin_lat, origin_lng, [destinations[i] for i in missing]
+            )
+            for i, result in zip(missing, fetched):
+                self._cache_put(result)
+                results[i] = result
+        
+        return results
+    
+    async def _fetch_table(
+        self,
+        origin_lat: float,
+        origin_lng: float,
+        destinations: List[Tuple[float, float]]
+    ) -> List[RouteResult]:
+        """Query OSRM /table for one origin to many destinations, bypassing the cache."""
         client = await self._get_async_client()
         
         # Build coordinate string: origin first, then all destinations
@@ -211,54 +440,7 @@ class RoutingService:
                 "sources": "0",  # Only origin as source
                 "annotations": "distance,duration"
             })
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get("code") != "Ok":
-                logger.error(f"OSRM table query failed: {data.get('message')}")
-                return [
-                    RouteResult(
-                        origin=(origin_lat, origin_lng),
-                        destination=dest,
-                        distance_km=float('inf'),
-                        duration_min=float('inf'),
-                        connected=False,
-                        error=data.get('message', 'Table query failed')
-                    )
-                    for dest in destinations
-                ]
-            
-            # Parse results
-            distances = data.get("distances", [[]])[0]  # First row (from origin to all)
-            durations = data.get("durations", [[]])[0]
-            
-            results = []
-            for i, dest in enumerate(destinations):
-                # Index i+1 because index 0 is origin-to-origin
-                dist = distances[i + 1] if i + 1 < len(distances) else None
-                dur = durations[i + 1] if i + 1 < len(durations) else None
-                
-                if dist is not None and dur is not None:
-                    results.append(RouteResult(
-                        origin=(origin_lat, origin_lng),
-                        destination=dest,
-                        distance_km=dist / 1000,
-                        duration_min=dur / 60,
-                        connected=True
-                    ))
-                else:
-                    results.append(RouteResult(
-                        origin=(origin_lat, origin_lng),
-                        destination=dest,
-                        distance_km=float('inf'),
-                        duration_min=float('inf'),
-                        connected=False,
-                        error="No route found"
-                    ))
-            
-            return results
-            
-        except httpx.HTTPError as e:
+        except (httpx.TimeoutException, httpx.TransportError) as e:
             logger.error(f"OSRM batch request failed: {e}")
             return [
                 RouteResult(
@@ -271,6 +453,65 @@ class RoutingService:
                 )
                 for dest in destinations
             ]
+        
+        if response.status_code != 200:
+            return [
+                RouteResult(
+                    origin=(origin_lat, origin_lng),
+                    destination=dest,
+                    distance_km=float('inf'),
+                    duration_min=float('inf'),
+                    connected=False,
+                    error=f"HTTP {response.status_code}"
+                )
+                for dest in destinations
+            ]
+        
+        data = response.json()
+        
+        if data.get("code") != "Ok":
+            logger.error(f"OSRM table query failed: {data.get('message')}")
+            return [
+                RouteResult(
+                    origin=(origin_lat, origin_lng),
+                    destination=dest,
+                    distance_km=float('inf'),
+                    duration_min=float('inf'),
+                    connected=False,
+                    error=data.get('message', 'Table query failed')
+                )
+                for dest in destinations
+            ]
+        
+        # Parse results
+        distances = data.get("distances", [[]])[0]  # First row (from origin to all)
+        durations = data.get("durations", [[]])[0]
+        
+        results = []
+        for i, dest in enumerate(destinations):
+            # Index i+1 because index 0 is origin-to-origin
+            dist = distances[i + 1] if i + 1 < len(distances) else None
+            dur = durations[i + 1] if i + 1 < len(durations) else None
+            
+            if dist is not None and dur is not None:
+                results.append(RouteResult(
+                    origin=(origin_lat, origin_lng),
+                    destination=dest,
+                    distance_km=dist / 1000,
+                    duration_min=dur / 60,
+                    connected=True
+                ))
+            else:
+                results.append(RouteResult(
+                    origin=(origin_lat, origin_lng),
+                    destination=dest,
+                    distance_km=float('inf'),
+                    duration_min=float('inf'),
+                    connected=False,
+                    error="No route found"
+                ))
+        
+        return results
     
     def batch_distance_sync(
         self,
@@ -282,6 +523,27 @@ class RoutingService:
         if not destinations:
             return []
         
+        origin = (origin_lat, origin_lng)
+        results = [self._cache_get(origin, dest) for dest in destinations]
+        missing = [i for i, r in enumerate(results) if r is None]
+        
+        if missing:
+            fetched = self._fetch_table_sync(
+                origin_lat, origin_lng, [destinations[i] for i in missing]
+            )
+            for i, result in zip(missing, fetched):
+                self._cache_put(result)
+                results[i] = result
+        
+        return results
+    
+    def _fetch_table_sync(
+        self,
+        origin_lat: float,
+        origin_lng: float,
+        destinations: List[Tuple[float, float]]
+    ) -> List[RouteResult]:
+        """Synchronous version of _fetch_table."""
         client = self._get_sync_client()
         
         all_coords = [self._format_coords(origin_lat, origin_lng)]
@@ -295,51 +557,7 @@ class RoutingService:
                 "sources": "0",
                 "annotations": "distance,duration"
             })
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get("code") != "Ok":
-                return [
-                    RouteResult(
-                        origin=(origin_lat, origin_lng),
-                        destination=dest,
-                        distance_km=float('inf'),
-                        duration_min=float('inf'),
-                        connected=False,
-                        error=data.get('message', 'Table query failed')
-                    )
-                    for dest in destinations
-                ]
-            
-            distances = data.get("distances", [[]])[0]
-            durations = data.get("durations", [[]])[0]
-            
-            results = []
-            for i, dest in enumerate(destinations):
-                dist = distances[i + 1] if i + 1 < len(distances) else None
-                dur = durations[i + 1] if i + 1 < len(durations) else None
-                
-                if dist is not None and dur is not None:
-                    results.append(RouteResult(
-                        origin=(origin_lat, origin_lng),
-                        destination=dest,
-                        distance_km=dist / 1000,
-                        duration_min=dur / 60,
-                        connected=True
-                    ))
-                else:
-                    results.append(RouteResult(
-                        origin=(origin_lat, origin_lng),
-                        destination=dest,
-                        distance_km=float('inf'),
-                        duration_min=float('inf'),
-                        connected=False,
-                        error="No route found"
-                    ))
-            
-            return results
-            
-        except httpx.HTTPError as e:
+        except (httpx.TimeoutException, httpx.TransportError) as e:
             logger.error(f"OSRM batch request failed: {e}")
             return [
                 RouteResult(
@@ -352,6 +570,162 @@ class RoutingService:
                 )
                 for dest in destinations
             ]
+        
+        if response.status_code != 200:
+            return [
+                RouteResult(
+                    origin=(origin_lat, origin_lng),
+                    destination=dest,
+                    distance_km=float('inf'),
+                    duration_min=float('inf'),
+                    connected=False,
+                    error=f"HTTP {response.status_code}"
+                )
+                for dest in destinations
+            ]
+        
+        data = response.json()
+        
+        if data.get("code") != "Ok":
+            return [
+                RouteResult(
+                    origin=(origin_lat, origin_lng),
+                    destination=dest,
+                    distance_km=float('inf'),
+                    duration_min=float('inf'),
+                    connected=False,
+                    error=data.get('message', 'Table query failed')
+                )
+                for dest in destinations
+            ]
+        
+        distances = data.get("distances", [[]])[0]
+        durations = data.get("durations", [[]])[0]
+        
+        results = []
+        for i, dest in enumerate(destinations):
+            dist = distances[i + 1] if i + 1 < len(distances) else None
+            dur = durations[i + 1] if i + 1 < len(durations) else None
+            
+            if dist is not None and dur is not None:
+                results.append(RouteResult(
+                    origin=(origin_lat, origin_lng),
+                    destination=dest,
+                    distance_km=dist / 1000,
+                    duration_min=dur / 60,
+                    connected=True
+                ))
+            else:
+                results.append(RouteResult(
+                    origin=(origin_lat, origin_lng),
+                    destination=dest,
+                    distance_km=float('inf'),
+                    duration_min=float('inf'),
+                    connected=False,
+                    error="No route found"
+                ))
+        
+        return results
+    
+    async def batch_matrix(
+        self,
+        origins: List[Tuple[float, float]],
+        destinations: List[Tuple[float, float]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the full distance matrix from many origins to a shared destination set.
+        
+        Issues a single multi-source OSRM table query, so OSRM can share graph
+        exploration across origins instead of answering one query per origin.
+        
+        Args:
+            origins: List of (lat, lng) tuples for origins
+            destinations: List of (lat, lng) tuples for destinations
+            
+        Returns:
+            (distances_km, durations_min) arrays of shape (len(origins), len(destinations)),
+            with inf where no route exists or the query failed
+        """
+        if not origins or not destinations:
+            empty = np.full((len(origins), len(destinations)), np.inf)
+            return empty, empty.copy()
+        
+        client = await self._get_async_client()
+        url, params = self._matrix_request(origins, destinations)
+        
+        try:
+            response = await client.get(url, params=params)
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            logger.error(f"OSRM matrix request failed: {e}")
+            return self._parse_matrix(None, len(origins), len(destinations))
+        
+        if response.status_code != 200:
+            logger.error(f"OSRM matrix request failed: HTTP {response.status_code}")
+            return self._parse_matrix(None, len(origins), len(destinations))
+        
+        return self._parse_matrix(response.json(), len(origins), len(destinations))
+    
+    def batch_matrix_sync(
+        self,
+        origins: List[Tuple[float, float]],
+        destinations: List[Tuple[float, float]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Synchronous version of batch_matrix."""
+        if not origins or not destinations:
+            empty = np.full((len(origins), len(destinations)), np.inf)
+            return empty, empty.copy()
+        
+        client = self._get_sync_client()
+        url, params = self._matrix_request(origins, destinations)
+        
+        try:
+            response = client.get(url, params=params)
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            logger.error(f"OSRM matrix request failed: {e}")
+            return self._parse_matrix(None, len(origins), len(destinations))
+        
+        if response.status_code != 200:
+            logger.error(f"OSRM matrix request failed: HTTP {response.status_code}")
+            return self._parse_matrix(None, len(origins), len(destinations))
+        
+        return self._parse_matrix(response.json(), len(origins), len(destinations))
+    
+    def _matrix_request(
+        self,
+        origins: List[Tuple[float, float]],
+        destinations: List[Tuple[float, float]]
+    ) -> Tuple[str, Dict[str, str]]:
+        """Build the OSRM table URL and params for an origins x destinations query."""
+        n_orig = len(origins)
+        coords_str = ";".join(
+            self._format_coords(lat, lng) for lat, lng in [*origins, *destinations]
+        )
+        url = f"{self.config.base_url}/table/v1/{self.config.profile}/{coords_str}"
+        params = {
+            "sources": ";".join(str(i) for i in range(n_orig)),
+            "destinations": ";".join(str(n_orig + j) for j in range(len(destinations))),
+            "annotations": "distance,duration"
+        }
+        return url, params
+    
+    def _parse_matrix(
+        self,
+        data: Optional[Dict],
+        n_orig: int,
+        n_dest: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Convert an OSRM table response into (distances_km, durations_min) arrays."""
+        if not data or data.get("code") != "Ok":
+            if data:
+                logger.error(f"OSRM matrix query failed: {data.get('message')}")
+            return np.full((n_orig, n_dest), np.inf), np.full((n_orig, n_dest), np.inf)
+        
+        # Unroutable pairs come back as null, which numpy turns into nan
+        distances = np.asarray(data["distances"], dtype=np.float64).reshape(n_orig, n_dest) / 1000
+        durations = np.asarray(data["durations"], dtype=np.float64).reshape(n_orig, n_dest) / 60
+        distances[np.isnan(distances)] = np.inf
+        durations[np.isnan(durations)] = np.inf
+        return distances, durations
     
     async def check_connectivity(
         self,
@@ -386,6 +760,36 @@ class RoutingService:
         )
         return result.connected
     
+    async def warmup(self, n: int = 4) -> int:
+        """
+        Prime the async connection pool with a few lightweight OSRM queries.
+        
+        Issues n concurrent /nearest requests so that the first real query
+        does not pay TCP connection setup, and OSRM has its data pages hot.
+        
+        Args:
+            n: Number of concurrent requests (and pooled connections) to open
+        
+        Returns:
+            Number of requests that succeeded
+        """
+        client = await self._get_async_client()
+        
+        # Delhi, same as the health check
+        url = f"{self.config.base_url}/nearest/v1/{self.config.profile}/77.2090,28.6139"
+        
+        responses = await asyncio.gather(
+            *(client.get(url) for _ in range(n)),
+            return_exceptions=True
+        )
+        
+        ok = sum(
+            1 for r in responses
+            if isinstance(r, httpx.Response) and r.status_code == 200
+        )
+        logger.info(f"OSRM warmup: {ok}/{n} connections ready")
+        return ok
+    
     async def health_check(self) -> Dict:
         """
         Check if OSRM service is available and responding.
@@ -3,14 +3,109 @@ Voronoi computation engine - core geospatial processing
 Uses a robust algorithm to handle infinite Voronoi regions.
 """
 from typing import List, Tuple, Optional, Dict, Any
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import json
 import numpy as np
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import shapely
 from scipy.spatial import Voronoi
 from shapely.geometry import Polygon, MultiPolygon, box, Point
 from shapely.ops import unary_union
+from shapely.strtree import STRtree
 import geopandas as gpd
 import pyproj
 
+from .cache_paths import cache_dir
+
+# Precision grid (projected metres) used to dedupe and clean cell vertices
+VERTEX_GRID_SIZE = 1e-6
+
+# Simplification tolerance (projected metres) applied to cells before clipping
+SIMPLIFY_TOLERANCE = 1.0
+
+# The India boundary is split into a grid of this many tiles per side, so
+# each cell is clipped against only the few tiles it touches
+BOUNDARY_TILE_DIVISIONS = 8
+
+# Overlap (projected metres) between neighbouring tiles, so that pieces
+# clipped from adjacent tiles union back together without seams
+BOUNDARY_TILE_OVERLAP = 10.0
+
+# Qhull flags for the Voronoi build: Qbb scales the paraboloid for precision,
+# Qc keeps coplanar (duplicate) sites, Qz adds a point at infinity for
+# cospherical inputs such as regular grids of facilities
+QHULL_OPTIONS = "Qbb Qc Qz"
+
+# Cells per worker chunk when clipping in parallel; GEOS releases the GIL,
+# so threads scale with cores. Smaller batches are clipped in one call.
+CLIP_CHUNK_SIZE = 500
+
+# From this many sites up, cells are built by GEOS (shapely.voronoi_polygons)
+# in C instead of walking scipy's list-of-lists regions in Python
+GEOS_VORONOI_MIN_POINTS = 10_000
+
+# Number of recent diagrams kept in memory, keyed by a hash of the inputs
+VORONOI_CACHE_SIZE = 32
+
+# shapely.get_type_id codes
+_POLYGON = 3
+_MULTIPOLYGON = 6
+
+
+@dataclass
+class VoronoiCells:
+    """
+    Clipped Voronoi cells as parallel arrays (structure of arrays), in WGS84.
+    
+    Cell i's exterior ring is ring_coords[ring_offsets[i]:ring_offsets[i + 1]].
+    """
+    ids: List[str]
+    names: List[str]
+    types: List[Optional[str]]
+    sites: List[Tuple[float, float]]
+    areas_sq_km: np.ndarray
+    ring_coords: np.ndarray
+    ring_offsets: np.ndarray
+    
+    def polygons(self) -> np.ndarray:
+        """Build every cell as a shapely Polygon in one vectorized call."""
+        ring_index = np.repeat(np.arange(len(self.ids)), np.diff(self.ring_offsets))
+        return shapely.polygons(shapely.linearrings(self.ring_coords, indices=ring_index))
+    
+    def to_geojson(self) -> Dict[str, Any]:
+        """Assemble the GeoJSON FeatureCollection in a single pass."""
+        rings = np.split(self.ring_coords, self.ring_offsets[1:-1])
+        features = [
+            {
+                "type": "Feature",
+                "id": facility_id,
+                "properties": {
+                    "name": name,
+                    "facility_id": facility_id,
+                    "type": facility_type,
+                    "area_sq_km": area_sq_km,
+                    "centroid_lng": site[0],
+                    "centroid_lat": site[1],
+                },
+                "geometry": {
+                    "type": "Polygon",
+                    "coordinates": [ring.tolist()]
+                }
+            }
+            for facility_id, name, facility_type, site, area_sq_km, ring in zip(
+                self.ids, self.names, self.types, self.sites, self.areas_sq_km.tolist(), rings
+            )
+        ]
+        
+        return {
+            "type": "FeatureCollection",
+            "features": features
+        }
+
 
 class VoronoiEngine:
     """
@@ -32,6 +127,15 @@ class VoronoiEngine:
     # Cached India boundary geometry (loaded from shapefile)
     _india_boundary_wgs84 = None
     _india_boundary_projected = None
+    _india_boundary_tiles: Optional[Tuple[np.ndarray, STRtree]] = None
+    
+    # Cached state boundaries (loaded from states.geojson), keyed by lowercased name
+    _state_boundaries_wgs84: Optional[Dict[str, Polygon]] = None
+    _state_boundaries_projected: Dict[str, Polygon] = {}
+    
+    # Recently computed cells, shared by all engine instances (LRU order)
+    _cells_cache: "OrderedDict[str, VoronoiCells]" = OrderedDict()
+    _cells_cache_lock = threading.Lock()
     
     def __init__(self):
         # Set up coordinate transformers
@@ -61,9 +165,19 @@ class VoronoiEngine:
             print("Falling back to bounding box for clipping.")
             return
         
+        cached = self._read_boundary_cache("india_boundary", shapefile_path)
+        if cached is not None:
+            unified_boundary, projected_boundary = cached[0]["india"], cached[1]["india"]
+            shapely.prepare(unified_boundary)
+            shapely.prepare(projected_boundary)
+            VoronoiEngine._india_boundary_wgs84 = unified_boundary
+            VoronoiEngine._india_boundary_projected = projected_boundary
+            VoronoiEngine._india_boundary_tiles = self._tile_boundary(projected_boundary)
+            return
+        
         try:
             # Load the shapefile
-            gdf = gpd.read_file(shapefile_path)
+            gdf = gpd.read_file(shapefile_path, engine="pyogrio", use_arrow=True)
             
             # Ensure CRS is WGS84
             if gdf.crs is None:
@@ -78,6 +192,9 @@ class VoronoiEngine:
             if not unified_boundary.is_valid:
                 unified_boundary = unified_boundary.buffer(0)
             
+            # Prepared geometries cache their spatial index across the
+            # many contains/intersection calls made against them
+            shapely.prepare(unified_boundary)
             VoronoiEngine._india_boundary_wgs84 = unified_boundary
             
             # Also create projected version for Voronoi clipping
@@ -85,24 +202,45 @@ class VoronoiEngine:
             projected_boundary = unary_union(gdf_projected.geometry)
             if not projected_boundary.is_valid:
                 projected_boundary = projected_boundary.buffer(0)
+            shapely.prepare(projected_boundary)
             VoronoiEngine._india_boundary_projected = projected_boundary
+            VoronoiEngine._india_boundary_tiles = self._tile_boundary(projected_boundary)
             
+            self._write_boundary_cache(
+                "india_boundary", shapefile_path,
+                {"india": unified_boundary}, {"india": projected_boundary}
+            )
             print(f"Loaded India boundary from shapefile ({len(gdf)} states)")
             
         except Exception as e:
             print(f"Error loading India shapefile: {e}")
             print("Falling back to bounding box for clipping.")
     
-    def _get_state_boundary_wgs84(self, state_name: str) -> Optional[Polygon]:
-        """Load boundary for a specific state from states.geojson in WGS84."""
+    def _load_state_boundaries(self):
+        """
+        Load every state boundary from states.geojson once and cache it,
+        both in WGS84 and in the projected CRS used for Voronoi clipping.
+        """
+        if VoronoiEngine._state_boundaries_wgs84 is not None:
+            return  # Already loaded
+        
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         geojson_path = os.path.join(base_dir, "data", "states.geojson")
         
         if not os.path.exists(geojson_path):
-            return None
+            return
+        
+        cached = self._read_boundary_cache("states", geojson_path)
+        if cached is not None:
+            wgs84, projected = cached
+            for geom in (*wgs84.values(), *projected.values()):
+                shapely.prepare(geom)
+            VoronoiEngine._state_boundaries_projected = projected
+            VoronoiEngine._state_boundaries_wgs84 = wgs84
+            return
         
         try:
-            gdf = gpd.read_file(geojson_path)
+            gdf = gpd.read_file(geojson_path, engine="pyogrio", use_arrow=True)
             
             # Ensure CRS is WGS84
             if gdf.crs is None:
@@ -110,59 +248,144 @@ class VoronoiEngine:
             elif gdf.crs.to_epsg() != 4326:
                 gdf = gdf.to_crs("EPSG:4326")
             
-            # Find the state (case-insensitive)
-            state_gdf = gdf[gdf['state'].str.lower() == state_name.lower()]
+            # Keep the first geometry per state name (case-insensitive)
+            names = []
+            geoms = []
+            for name, geom in zip(gdf['state'], gdf.geometry):
+                if not isinstance(name, str) or name.lower() in names or geom is None:
+                    continue
+                if not geom.is_valid:
+                    geom = geom.buffer(0)
+                names.append(name.lower())
+                geoms.append(geom)
             
-            if len(state_gdf) == 0:
-                return None
+            # Project all states to UTM in one pass
+            projected_geoms = gpd.GeoSeries(geoms, crs="EPSG:4326").to_crs(self.CRS_PROJECTED)
+            
+            wgs84 = {}
+            projected = {}
+            for name, geom, projected_geom in zip(names, geoms, projected_geoms):
+                if not projected_geom.is_valid:
+                    projected_geom = projected_geom.buffer(0)
+                shapely.prepare(geom)
+                shapely.prepare(projected_geom)
+                wgs84[name] = geom
+                projected[name] = projected_geom
             
-            # Get the geometry
-            state_geom = state_gdf.iloc[0].geometry
-            if not state_geom.is_valid:
-                state_geom = state_geom.buffer(0)
+            VoronoiEngine._state_boundaries_projected = projected
+            VoronoiEngine._state_boundaries_wgs84 = wgs84
             
-            return state_geom
+            self._write_boundary_cache("states", geojson_path, wgs84, projected)
             
         except Exception as e:
-            print(f"Error loading state boundary WGS84: {e}")
+            print(f"Error loading state boundaries: {e}")
+    
+    def _boundary_cache_path(self, name: str, source_path: str) -> str:
+        """
+        Cache file for a boundary, outside the source tree. The name carries
+        the projected CRS and the source file's size and mtime, so editing
+        the source makes old entries unreachable.
+        """
+        st = os.stat(source_path)
+        crs_tag = self.CRS_PROJECTED.replace(":", "_").lower()
+        return os.path.join(
+            cache_dir("boundaries"), f"{name}_{crs_tag}_{st.st_size}_{st.st_mtime_ns}.json"
+        )
+    
+    def _read_boundary_cache(
+        self, name: str, source_path: str
+    ) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Load cached (WGS84, projected) geometries by name for a source file.
+        Returns None when missing or unreadable.
+        """
+        try:
+            cache_path = self._boundary_cache_path(name, source_path)
+            with open(cache_path) as f:
+                data = json.load(f)
+            # Plain WKB, so loading never runs code from the file
+            wgs84 = shapely.from_wkb(data["wgs84"])
+            projected = shapely.from_wkb(data["projected"])
+            return dict(zip(data["names"], wgs84)), dict(zip(data["names"], projected))
+        except FileNotFoundError:
             return None
-
-    def _get_state_boundary(self, state_name: str) -> Optional[Polygon]:
-        """Load boundary for a specific state from states.geojson in Projected CRS."""
-        state_geom = self._get_state_boundary_wgs84(state_name)
-        if state_geom is None:
+        except Exception as e:
+            print(f"Error reading boundary cache for {name}: {e}")
             return None
-        
+    
+    def _write_boundary_cache(
+        self, name: str, source_path: str, wgs84: Dict[str, Any], projected: Dict[str, Any]
+    ):
+        """Save loaded boundaries as WKB so later cold starts can skip reprojection."""
         try:
-            # Project to UTM for Voronoi clipping
-            gs = gpd.GeoSeries([state_geom], crs="EPSG:4326")
-            gs_proj = gs.to_crs(self.CRS_PROJECTED)
-            projected_geom = gs_proj.iloc[0]
-            
-            if not projected_geom.is_valid:
-                projected_geom = projected_geom.buffer(0)
-            
-            return projected_geom
+            cache_path = self._boundary_cache_path(name, source_path)
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            names = list(wgs84)
+            data = {
+                "names": names,
+                "wgs84": shapely.to_wkb([wgs84[n] for n in names], hex=True).tolist(),
+                "projected": shapely.to_wkb([projected[n] for n in names], hex=True).tolist(),
+            }
+            # Write then rename, so a concurrent reader never sees a partial file
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, cache_path)
             
+            # Drop entries for older versions of the source
+            prefix = os.path.basename(cache_path).rsplit("_", 2)[0] + "_"
+            for entry in os.listdir(os.path.dirname(cache_path)):
+                if entry.startswith(prefix) and entry.endswith(".json") \
+                        and entry != os.path.basename(cache_path):
+                    os.remove(os.path.join(os.path.dirname(cache_path), entry))
         except Exception as e:
-            print(f"Error projecting state boundary: {e}")
-            return None
+            print(f"Error writing boundary cache for {name}: {e}")
+    
+    def _tile_boundary(
+        self,
+        boundary: Polygon,
+        divisions: int = BOUNDARY_TILE_DIVISIONS
+    ) -> Tuple[np.ndarray, STRtree]:
+        """
+        Split a boundary into a divisions x divisions grid of slightly
+        overlapping tiles, indexed with an STRtree.
+        """
+        min_x, min_y, max_x, max_y = boundary.bounds
+        xs = np.linspace(min_x, max_x, divisions + 1)
+        ys = np.linspace(min_y, max_y, divisions + 1)
+        x0, y0 = np.meshgrid(xs[:-1], ys[:-1])
+        x1, y1 = np.meshgrid(xs[1:], ys[1:])
+        
+        boxes = shapely.box(
+            x0.ravel() - BOUNDARY_TILE_OVERLAP, y0.ravel() - BOUNDARY_TILE_OVERLAP,
+            x1.ravel() + BOUNDARY_TILE_OVERLAP, y1.ravel() + BOUNDARY_TILE_OVERLAP
+        )
+        tiles = shapely.intersection(boxes, boundary)
+        tiles = tiles[~shapely.is_empty(tiles)]
+        shapely.prepare(tiles)
+        return tiles, STRtree(tiles)
+    
+    def _get_state_boundary_wgs84(self, state_name: str) -> Optional[Polygon]:
+        """Get the cached boundary for a specific state in WGS84."""
+        self._load_state_boundaries()
+        return (VoronoiEngine._state_boundaries_wgs84 or {}).get(state_name.lower())
+
+    def _get_state_boundary(self, state_name: str) -> Optional[Polygon]:
+        """Get the cached boundary for a specific state in Projected CRS."""
+        self._load_state_boundaries()
+        return VoronoiEngine._state_boundaries_projected.get(state_name.lower())
     
     def _project_coords(self, coords: List[Tuple[float, float]]) -> np.ndarray:
-        """Project WGS84 coordinates to UTM"""
-        projected = []
-        for lng, lat in coords:
-            x, y = self.to_projected.transform(lng, lat)
-            projected.append([x, y])
-        return np.array(projected)
-    
-    def _unproject_coords(self, coords: np.ndarray) -> List[Tuple[float, float]]:
-        """Unproject UTM coordinates back to WGS84"""
-        unprojected = []
-        for x, y in coords:
-            lng, lat = self.to_wgs84.transform(x, y)
-            unprojected.append((lng, lat))
-        return unprojected
+        """Project WGS84 coordinates to UTM (one batched pyproj call)"""
+        arr = np.asarray(coords, dtype=np.float64)
+        xs, ys = self.to_projected.transform(arr[:, 0], arr[:, 1])
+        # Qhull takes C-contiguous float64 without an internal copy
+        return np.ascontiguousarray(np.column_stack([xs, ys]), dtype=np.float64)
+    
+    def _unproject_coords(self, coords: np.ndarray) -> np.ndarray:
+        """Unproject UTM coordinates back to WGS84 (one batched pyproj call)"""
+        lngs, lats = self.to_wgs84.transform(coords[:, 0], coords[:, 1])
+        return np.column_stack([lngs, lats])
     
     def _get_bounding_box(self, coords: np.ndarray, buffer: float = 0.5) -> Polygon:
         """
@@ -193,7 +416,8 @@ class VoronoiEngine:
     def _voronoi_regions(
         self,
         vor: Voronoi,
-        bounding_box: Polygon
+        bounding_box: Polygon,
+        tiles: Optional[Tuple[np.ndarray, STRtree]] = None
     ) -> List[Tuple[int, Polygon]]:
         """
         Reconstruct all Voronoi regions including infinite ones.
@@ -201,15 +425,40 @@ class VoronoiEngine:
         
         This implementation handles all points including closely-spaced ones.
         """
-        from scipy.spatial import ConvexHull
-        
         center = vor.points.mean(axis=0)
         
         # Compute a radius large enough to contain all points
         ptp_bound = np.ptp(vor.points, axis=0)
         radius = max(ptp_bound.max() * 10, 5000000)  # At least 5000km for full India coverage
         
-        polygons = []
+        # Ridge vertex pairs as one (R, 2) int array instead of a list of lists
+        ridge_vertices = np.asarray(vor.ridge_vertices, dtype=np.intp).reshape(-1, 2)
+        
+        # Far endpoints of all infinite ridges, computed in one vectorized pass
+        far_points = self._far_points(vor, ridge_vertices, center, radius)
+        
+        # Index ridges by input point once, instead of rescanning every ridge
+        # for every point (O(N^2) for large inputs)
+        ridges_by_point = [[] for _ in range(len(vor.points))]
+        for ridge_idx, (p1, p2) in enumerate(vor.ridge_points):
+            ridges_by_point[p1].append(ridge_idx)
+            ridges_by_point[p2].append(ridge_idx)
+        
+        # One vertex table: the finite Voronoi vertices followed by the far
+        # points of infinite ridges. Each cell is then just a run of row ids,
+        # and all coordinates are gathered with one fancy index after the loop
+        # instead of several small arrays per cell
+        n_vertices = len(vor.vertices)
+        vertex_table = np.vstack([vor.vertices, far_points])
+        far_ids = np.where(
+            np.isnan(far_points[:, 0]), -1, n_vertices + np.arange(len(far_points))
+        )
+        ridge_ids = np.column_stack([ridge_vertices, far_ids]).tolist()
+        
+        point_indices = []
+        ring_lengths = []
+        ring_is_infinite = []
+        vertex_ids = []
         
         for point_idx, region_idx in enumerate(vor.point_region):
             region = vor.regions[region_idx]
@@ -221,84 +470,218 @@ class VoronoiEngine:
             try:
                 if -1 not in region:
                     # Finite region - use vertices directly
-                    vertices = vor.vertices[region]
-                    poly = self._make_valid_polygon(vertices)
-                    if poly is not None:
-                        clipped = self._clip_polygon(poly, bounding_box)
-                        if clipped is not None:
-                            polygons.append((point_idx, clipped))
-                    continue
-                
-                # Infinite region - need to extend ridges to far points
-                # Collect all vertices for this region (both finite and extended)
-                all_vertices = []
-                
-                for ridge_idx, (p1, p2) in enumerate(vor.ridge_points):
-                    if p1 != point_idx and p2 != point_idx:
+                    ids = region
+                else:
+                    # Infinite region - the finite vertices and extended far
+                    # points of all its ridges. Shared vertices appear once per
+                    # ridge; the duplicates are collapsed by the precision snap
+                    # in _make_valid_polygons
+                    ids = [
+                        v for ridge in ridges_by_point[point_idx]
+                        for v in ridge_ids[ridge] if v >= 0
+                    ]
+                    if len(ids) < 3:
                         continue
-                    
-                    v1, v2 = vor.ridge_vertices[ridge_idx]
-                    other_point = p2 if p1 == point_idx else p1
-                    
-                    # Add finite vertices
-                    if v1 >= 0:
-                        all_vertices.append(tuple(vor.vertices[v1]))
-                    if v2 >= 0:
-                        all_vertices.append(tuple(vor.vertices[v2]))
-                    
-                    # Extend infinite vertices
-                    if v1 == -1 or v2 == -1:
-                        finite_v = v2 if v1 == -1 else v1
-                        if finite_v >= 0:
-                            # Compute direction perpendicular to the ridge
-                            t = vor.points[other_point] - vor.points[point_idx]
-                            norm = np.linalg.norm(t)
-                            if norm > 0:
-                                t = t / norm
-                                n = np.array([-t[1], t[0]])
-                                
-                                midpoint = (vor.points[point_idx] + vor.points[other_point]) / 2
-                                direction = np.sign(np.dot(midpoint - center, n)) * n
-                                
-                                far_point = vor.vertices[finite_v] + direction * radius
-                                all_vertices.append(tuple(far_point))
                 
-                # De-duplicate vertices (close points can create duplicate vertices)
-                unique_vertices = list(set(all_vertices))
-                
-                if len(unique_vertices) >= 3:
-                    # Use ConvexHull to properly order vertices
-                    vertices_array = np.array(unique_vertices)
-                    try:
-                        hull = ConvexHull(vertices_array)
-                        ordered_vertices = vertices_array[hull.vertices]
-                        poly = self._make_valid_polygon(ordered_vertices)
-                    except Exception:
-                        # Fallback: try angle-based sorting if ConvexHull fails
-                        point_center = vor.points[point_idx]
-                        angles = [np.arctan2(v[1] - point_center[1], v[0] - point_center[0]) 
-                                  for v in unique_vertices]
-                        sorted_vertices = [v for _, v in sorted(zip(angles, unique_vertices))]
-                        poly = self._make_valid_polygon(np.array(sorted_vertices))
-                    
-                    if poly is not None:
-                        clipped = self._clip_polygon(poly, bounding_box)
-                        if clipped is not None:
-                            polygons.append((point_idx, clipped))
+                point_indices.append(point_idx)
+                ring_lengths.append(len(ids))
+                ring_is_infinite.append(-1 in region)
+                vertex_ids.extend(ids)
                             
             except Exception as e:
                 # Log but don't fail - continue processing other points
                 print(f"Warning: Could not process Voronoi region for point {point_idx}: {e}")
                 continue
         
-        return polygons
+        if not point_indices:
+            return []
+        
+        point_indices = np.array(point_indices)
+        ring_lengths = np.array(ring_lengths)
+        ring_index = np.repeat(np.arange(len(ring_lengths)), ring_lengths)
+        coords = vertex_table[np.array(vertex_ids)]
+        
+        # Infinite cells are convex and contain their site, so sorting their
+        # vertices by angle around the site gives the boundary order; finite
+        # regions keep Qhull's order. Both are done in a single lexsort
+        sites = vor.points[point_indices[ring_index]]
+        angles = np.arctan2(coords[:, 1] - sites[:, 1], coords[:, 0] - sites[:, 0])
+        position = np.arange(len(coords), dtype=np.float64)
+        sort_key = np.where(np.array(ring_is_infinite)[ring_index], angles, position)
+        coords = coords[np.lexsort((sort_key, ring_index))]
+        
+        return self._clip_rings(point_indices, coords, ring_lengths, bounding_box, tiles)
+    
+    def _geos_voronoi_regions(
+        self,
+        points: np.ndarray,
+        bounding_box: Polygon,
+        tiles: Optional[Tuple[np.ndarray, STRtree]] = None
+    ) -> Optional[List[Tuple[int, Polygon]]]:
+        """
+        Build all Voronoi cells with GEOS, which returns finished polygons in
+        input order, so no per-region Python work is needed.
+        
+        Returns None if GEOS can't handle the input (e.g. duplicate sites) or
+        shapely/GEOS is too old for ordered output, in which case the scipy
+        path should be used.
+        """
+        # ordered=True needs GEOS 3.12 (and shapely 2.1)
+        if shapely.geos_version < (3, 12, 0):
+            return None
+        
+        center = points.mean(axis=0)
+        radius = max(np.ptp(points, axis=0).max() * 10, 5000000)
+        extent = shapely.box(*(center - radius), *(center + radius))
+        
+        try:
+            cells = shapely.get_parts(shapely.voronoi_polygons(
+                shapely.multipoints(points), extend_to=extent, ordered=True
+            ))
+        except (shapely.errors.ShapelyError, TypeError):
+            # TypeError: shapely < 2.1 has no ordered argument
+            return None
+        if len(cells) != len(points):
+            return None
+        
+        coords, ring_index = shapely.get_coordinates(
+            shapely.get_exterior_ring(cells), return_index=True
+        )
+        ring_lengths = np.bincount(ring_index, minlength=len(cells))
+        return self._clip_rings(np.arange(len(cells)), coords, ring_lengths, bounding_box, tiles)
+    
+    def _clip_rings(
+        self,
+        point_indices: np.ndarray,
+        coords: np.ndarray,
+        ring_lengths: np.ndarray,
+        bounding_box: Polygon,
+        tiles: Optional[Tuple[np.ndarray, STRtree]] = None
+    ) -> List[Tuple[int, Polygon]]:
+        """
+        Turn vertex rings into valid cells clipped to the bounding box.
+        
+        Ring i belongs to point_indices[i] and is the next ring_lengths[i]
+        rows of coords.
+        """
+        cells = self._make_valid_polygons(coords, ring_lengths)
+        polygons = [
+            (int(point_idx), poly)
+            for point_idx, poly in zip(point_indices, cells)
+            if poly is not None
+        ]
+        
+        # Clip every cell against the bounding polygon in one vectorized pass
+        clipped = self._clip_polygons([poly for _, poly in polygons], bounding_box, tiles)
+        return [
+            (point_idx, clipped_poly)
+            for (point_idx, _), clipped_poly in zip(polygons, clipped)
+            if clipped_poly is not None
+        ]
+    
+    def _far_points(
+        self,
+        vor: Voronoi,
+        ridge_vertices: np.ndarray,
+        center: np.ndarray,
+        radius: float
+    ) -> np.ndarray:
+        """
+        Extend every infinite ridge from its finite vertex out to `radius`.
+        
+        Returns an (R, 2) array aligned with ridge_vertices; rows for
+        finite (or degenerate) ridges are nan. The direction is perpendicular
+        to the segment between the ridge's two input points, pointing away
+        from the centroid - it doesn't depend on which of the two regions asks.
+        """
+        ridge_points = np.asarray(vor.ridge_points)
+        far_points = np.full((len(ridge_vertices), 2), np.nan)
+        
+        infinite = (ridge_vertices.min(axis=1) == -1) & (ridge_vertices.max(axis=1) >= 0)
+        if not infinite.any():
+            return far_points
+        
+        p1 = vor.points[ridge_points[infinite, 0]]
+        p2 = vor.points[ridge_points[infinite, 1]]
+        finite_v = ridge_vertices[infinite].max(axis=1)
+        
+        # Unit normal to the ridge, as separate x/y components: hypot plus
+        # elementwise products avoid np.linalg.norm and (R, 2) temporaries
+        tx = p2[:, 0] - p1[:, 0]
+        ty = p2[:, 1] - p1[:, 1]
+        length = np.hypot(tx, ty)
+        valid = length > 0
+        inv_length = np.divide(1.0, length, out=np.full_like(length, np.nan), where=valid)
+        nx = -ty * inv_length
+        ny = tx * inv_length
+        
+        # Point the normal away from the centroid
+        mx = (p1[:, 0] + p2[:, 0]) * 0.5 - center[0]
+        my = (p1[:, 1] + p2[:, 1]) * 0.5 - center[1]
+        scale = np.sign(mx * nx + my * ny) * radius
+        
+        # Degenerate ridges stay nan through inv_length
+        origin = vor.vertices[finite_v]
+        far_points[infinite, 0] = origin[:, 0] + nx * scale
+        far_points[infinite, 1] = origin[:, 1] + ny * scale
+        return far_points
+    
+    def _make_valid_polygons(
+        self,
+        coords: np.ndarray,
+        ring_lengths: np.ndarray
+    ) -> List[Optional[Polygon]]:
+        """
+        Build valid polygons from many vertex rings with vectorized shapely calls.
+        The rings are consecutive runs of `coords`, ring_lengths[i] rows each.
+        Returns a polygon (or None) per ring, aligned with the input.
+        """
+        results: List[Optional[Polygon]] = [None] * len(ring_lengths)
+        kept = ring_lengths >= 3
+        keep = np.flatnonzero(kept)
+        if not len(keep):
+            return results
+        
+        coords = coords[np.repeat(kept, ring_lengths)]
+        ring_ids = np.repeat(np.arange(len(keep)), ring_lengths[keep])
+        
+        try:
+            polys = shapely.polygons(shapely.linearrings(coords, indices=ring_ids))
+            # Snap to a micrometre grid in one pass: merges duplicate or
+            # jittered vertices (the same vertex computed two ways) and
+            # repairs the ring, so no buffer(0) round is needed
+            polys = shapely.set_precision(polys, VERTEX_GRID_SIZE, mode="valid_output")
+            
+            # Drop near-collinear vertices before the (super-linear) clip.
+            # The cells tile the plane, so they're simplified together as a
+            # coverage: each shared edge is simplified once and neighbours
+            # keep meeting exactly. Per-cell simplification would let shared
+            # edges drift into slivers/overlaps, so older GEOS skips this
+            if shapely.geos_version >= (3, 12, 0):
+                simplified = shapely.coverage_simplify(polys, SIMPLIFY_TOLERANCE)
+                if not (shapely.is_empty(simplified) | ~shapely.is_valid(simplified)).any():
+                    polys = simplified
+        except (ValueError, shapely.errors.GEOSException):
+            # A degenerate ring fails the whole batch - build individually instead
+            rings = np.split(coords, np.cumsum(ring_lengths[keep])[:-1])
+            for i, ring in zip(keep, rings):
+                results[i] = self._make_valid_polygon(ring)
+            return results
+        
+        usable = ~shapely.is_empty(polys) & (shapely.area(polys) > 0)
+        for i, poly, ok in zip(keep, polys, usable):
+            if ok:
+                results[i] = poly
+        return results
     
     def _make_valid_polygon(self, vertices: np.ndarray) -> Optional[Polygon]:
         """Create a valid polygon from vertices, handling edge cases."""
         if len(vertices) < 3:
             return None
         try:
-            poly = Polygon(vertices)
+            # Snap to a micrometre grid: merges duplicate / jittered vertices
+            # (the same vertex computed two ways) and repairs the ring
+            poly = shapely.set_precision(Polygon(vertices), VERTEX_GRID_SIZE, mode="valid_output")
             if not poly.is_valid:
                 # Try to fix with buffer(0)
                 poly = poly.buffer(0)
@@ -308,9 +691,123 @@ class VoronoiEngine:
             pass
         return None
     
+    def _clip_polygons(
+        self,
+        polys: List[Polygon],
+        bounding_box: Polygon,
+        tiles: Optional[Tuple[np.ndarray, STRtree]] = None
+    ) -> List[Optional[Polygon]]:
+        """
+        Clip many polygons to the bounding box with a single shapely call.
+        If `tiles` (from _tile_boundary) are given, cells crossing the boundary
+        are clipped against only the tiles they overlap.
+        Returns the largest piece of each (or None), aligned with the input.
+        """
+        if not polys:
+            return []
+        
+        try:
+            shapely.prepare(bounding_box)
+            polys_array = np.array(polys, dtype=object)
+            
+            # Envelope tests first: a cell can only lie inside the boundary if
+            # its envelope does, and can't overlap it if the envelopes are disjoint
+            cell_bounds = shapely.bounds(polys_array)
+            min_x, min_y, max_x, max_y = bounding_box.bounds
+            envelope_inside = (
+                (cell_bounds[:, 0] > min_x) & (cell_bounds[:, 1] > min_y) &
+                (cell_bounds[:, 2] < max_x) & (cell_bounds[:, 3] < max_y)
+            )
+            envelope_disjoint = (
+                (cell_bounds[:, 2] < min_x) | (cell_bounds[:, 0] > max_x) |
+                (cell_bounds[:, 3] < min_y) | (cell_bounds[:, 1] > max_y)
+            )
+            
+            # Cells wholly inside the boundary don't need the overlay at all
+            inside = np.zeros(len(polys_array), dtype=bool)
+            inside[envelope_inside] = shapely.contains_properly(
+                bounding_box, polys_array[envelope_inside]
+            )
+            
+            clipped = np.full(len(polys_array), None, dtype=object)
+            clipped[inside] = polys_array[inside]
+            overlay = ~inside & ~envelope_disjoint
+            if tiles is None:
+                clipped[overlay] = self._parallel_intersection(polys_array[overlay], bounding_box)
+            else:
+                clipped[overlay] = self._clip_to_tiles(polys_array[overlay], tiles)
+        except shapely.errors.GEOSException:
+            # One bad geometry fails the whole batch - clip individually instead
+            return [self._clip_polygon(poly, bounding_box) for poly in polys]
+        
+        areas = shapely.area(clipped)
+        type_ids = shapely.get_type_id(clipped)
+        
+        results = []
+        for geom, area, type_id in zip(clipped, areas, type_ids):
+            if not area > 0:  # also catches nan for skipped (None) cells
+                results.append(None)
+            elif type_id == _POLYGON:
+                results.append(geom)
+            elif type_id == _MULTIPOLYGON:
+                results.append(max(geom.geoms, key=lambda p: p.area))
+            else:
+                results.append(None)
+        return results
+    
+    def _parallel_intersection(self, geoms: np.ndarray, other) -> np.ndarray:
+        """
+        shapely.intersection(geoms, other) split into chunks across a thread
+        pool. `other` is a single geometry or an array aligned with `geoms`.
+        """
+        n = len(geoms)
+        if n <= CLIP_CHUNK_SIZE:
+            return shapely.intersection(geoms, other)
+        
+        aligned = isinstance(other, np.ndarray)
+        starts = range(0, n, CLIP_CHUNK_SIZE)
+        
+        def clip_chunk(start):
+            end = start + CLIP_CHUNK_SIZE
+            return shapely.intersection(geoms[start:end], other[start:end] if aligned else other)
+        
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            return np.concatenate(list(executor.map(clip_chunk, starts)))
+    
+    def _clip_to_tiles(
+        self,
+        polys: np.ndarray,
+        tiles: Tuple[np.ndarray, STRtree]
+    ) -> np.ndarray:
+        """
+        Intersect each polygon with the boundary tiles it overlaps and union
+        the pieces back together. Equivalent to intersecting with the whole
+        boundary, but each overlay only sees a tile's worth of vertices.
+        """
+        tile_geoms, tree = tiles
+        poly_idx, tile_idx = tree.query(polys, predicate="intersects")
+        order = np.argsort(poly_idx, kind="stable")
+        poly_idx, tile_idx = poly_idx[order], tile_idx[order]
+        
+        pieces = self._parallel_intersection(polys[poly_idx], tile_geoms[tile_idx])
+        starts = np.searchsorted(poly_idx, np.arange(len(polys) + 1))
+        
+        clipped = np.full(len(polys), None, dtype=object)
+        for i in range(len(polys)):
+            cell_pieces = pieces[starts[i]:starts[i + 1]]
+            if len(cell_pieces) == 1:
+                clipped[i] = cell_pieces[0]
+            elif len(cell_pieces) > 1:
+                clipped[i] = shapely.union_all(cell_pieces)
+        
+        # Drop the vertices the tile seams left along straight cell edges
+        return shapely.simplify(clipped, VERTEX_GRID_SIZE, preserve_topology=False)
+    
     def _clip_polygon(self, poly: Polygon, bounding_box: Polygon) -> Optional[Polygon]:
         """Clip a polygon to the bounding box, returning the largest piece."""
         try:
+            if bounding_box.contains_properly(poly):
+                return poly
             clipped = poly.intersection(bounding_box)
             if clipped.is_empty or clipped.area <= 0:
                 return None
@@ -345,15 +842,78 @@ class VoronoiEngine:
         Returns:
             GeoJSON FeatureCollection
         """
+        return self._compute_cells(
+            coords, names, facility_ids, types, clip_to_india, state_filter
+        ).to_geojson()
+    
+    def _compute_cells(
+        self,
+        coords: List[Tuple[float, float]],
+        names: List[str],
+        facility_ids: List[str],
+        types: Optional[List[str]] = None,
+        clip_to_india: bool = True,
+        state_filter: Optional[str] = None
+    ) -> VoronoiCells:
+        """
+        Compute the clipped Voronoi cells as parallel arrays (see compute_voronoi).
+        Repeated calls with the same inputs are served from an in-memory LRU cache.
+        """
+        key = self._cells_cache_key(
+            coords, names, facility_ids, types, clip_to_india, state_filter
+        )
+        with VoronoiEngine._cells_cache_lock:
+            cells = VoronoiEngine._cells_cache.get(key)
+            if cells is not None:
+                VoronoiEngine._cells_cache.move_to_end(key)
+                return cells
+        
+        cells = self._build_cells(
+            coords, names, facility_ids, types, clip_to_india, state_filter
+        )
+        
+        with VoronoiEngine._cells_cache_lock:
+            VoronoiEngine._cells_cache[key] = cells
+            while len(VoronoiEngine._cells_cache) > VORONOI_CACHE_SIZE:
+                VoronoiEngine._cells_cache.popitem(last=False)
+        return cells
+    
+    def _cells_cache_key(
+        self,
+        coords: List[Tuple[float, float]],
+        names: List[str],
+        facility_ids: List[str],
+        types: Optional[List[str]],
+        clip_to_india: bool,
+        state_filter: Optional[str]
+    ) -> str:
+        """Hash everything that determines the computed cells."""
+        digest = hashlib.blake2b(np.asarray(coords, dtype=np.float64).tobytes(), digest_size=16)
+        digest.update(json.dumps(
+            [
+                names, facility_ids, types, clip_to_india, state_filter,
+                VoronoiEngine._india_boundary_projected is not None
+            ],
+            default=str
+        ).encode())
+        return digest.hexdigest()
+    
+    def _build_cells(
+        self,
+        coords: List[Tuple[float, float]],
+        names: List[str],
+        facility_ids: List[str],
+        types: Optional[List[str]] = None,
+        clip_to_india: bool = True,
+        state_filter: Optional[str] = None
+    ) -> VoronoiCells:
+        """Compute the clipped Voronoi cells without consulting the cache."""
         if len(coords) < 3:
             raise ValueError("Need at least 3 points for Voronoi")
         
         # Project coordinates to UTM for accurate computation
         projected_coords = self._project_coords(coords)
         
-        # Compute Voronoi diagram
-        vor = Voronoi(projected_coords)
-        
         # Get bounding polygon for clipping
         if state_filter:
             # Use state boundary for clipping
@@ -372,38 +932,48 @@ class VoronoiEngine:
         else:
             bounding_box = self._get_bounding_box(projected_coords, buffer=0.5)
         
-        # Convert to polygons clipped to bounding box
-        polygons = self._voronoi_regions(vor, bounding_box)
+        # The full India boundary is clipped tile by tile
+        if bounding_box is VoronoiEngine._india_boundary_projected:
+            tiles = VoronoiEngine._india_boundary_tiles
+        else:
+            tiles = None
         
-        # Build GeoJSON features
-        features = []
-        for point_idx, polygon in polygons:
-            # Unproject polygon coordinates back to WGS84
-            exterior_coords = list(polygon.exterior.coords)
-            unprojected_exterior = self._unproject_coords(np.array(exterior_coords))
-            
-            feature = {
-                "type": "Feature",
-                "id": facility_ids[point_idx] if point_idx < len(facility_ids) else str(point_idx),
-                "properties": {
-                    "name": names[point_idx] if point_idx < len(names) else f"Facility_{point_idx}",
-                    "facility_id": facility_ids[point_idx] if point_idx < len(facility_ids) else str(point_idx),
-                    "type": types[point_idx] if types and point_idx < len(types) else None,
-                    "area_sq_km": polygon.area / 1_000_000,  # Convert from sq meters
-                    "centroid_lng": coords[point_idx][0],
-                    "centroid_lat": coords[point_idx][1],
-                },
-                "geometry": {
-                    "type": "Polygon",
-                    "coordinates": [unprojected_exterior]
-                }
-            }
-            features.append(feature)
+        # Compute Voronoi diagram and convert to polygons clipped to bounding box
+        polygons = None
+        if len(projected_coords) >= GEOS_VORONOI_MIN_POINTS:
+            polygons = self._geos_voronoi_regions(projected_coords, bounding_box, tiles)
+        if polygons is None:
+            vor = Voronoi(projected_coords, qhull_options=QHULL_OPTIONS)
+            polygons = self._voronoi_regions(vor, bounding_box, tiles)
         
-        return {
-            "type": "FeatureCollection",
-            "features": features
-        }
+        # Pull every exterior ring out in one vectorized call and unproject
+        # them with a single transform
+        cells = np.array([polygon for _, polygon in polygons], dtype=object)
+        ring_coords, ring_index = shapely.get_coordinates(
+            shapely.get_exterior_ring(cells), return_index=True
+        )
+        ring_offsets = np.zeros(len(cells) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(ring_index, minlength=len(cells)), out=ring_offsets[1:])
+        
+        point_indices = [point_idx for point_idx, _ in polygons]
+        return VoronoiCells(
+            ids=[
+                facility_ids[i] if i < len(facility_ids) else str(i)
+                for i in point_indices
+            ],
+            names=[
+                names[i] if i < len(names) else f"Facility_{i}"
+                for i in point_indices
+            ],
+            types=[
+                types[i] if types and i < len(types) else None
+                for i in point_indices
+            ],
+            sites=[coords[i] for i in point_indices],
+            areas_sq_km=shapely.area(cells) / 1_000_000,  # Convert from sq meters
+            ring_coords=self._unproject_coords(ring_coords),
+            ring_offsets=ring_offsets,
+        )
     
     def compute_voronoi_with_dcel(
         self,
@@ -422,7 +992,7 @@ class VoronoiEngine:
         """
         from app.services.dcel import DCEL, set_current_dcel
         
-        geojson = self.compute_voronoi(
+        cells = self._compute_cells(
             coords=coords,
             names=names,
             facility_ids=facility_ids,
@@ -430,9 +1000,12 @@ class VoronoiEngine:
             clip_to_india=clip_to_india,
             state_filter=state_filter
         )
+        geojson = cells.to_geojson()
         
+        # Hand the DCEL the cell polygons directly rather than having it
+        # re-parse them from the GeoJSON coordinate lists
         dcel = DCEL()
-        dcel.build_from_voronoi(geojson)
+        dcel.build_from_voronoi(geojson, polygons=cells.polygons())
         set_current_dcel(dcel)
         
         return geojson, dcel
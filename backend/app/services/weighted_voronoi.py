@@ -9,27 +9,45 @@ Implements road-adjusted Voronoi using additive weights:
 This produces mathematically valid Voronoi cells that reflect road network influence.
 """
 
+import asyncio
+import functools
 import logging
+import math
+import os
+import threading
 import time
 import numpy as np
-import httpx
+import pyproj
+import shapely
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple, Set
-from scipy.spatial import Voronoi, KDTree
-from shapely.geometry import Polygon, Point, MultiPoint, LineString
-from shapely.ops import unary_union
+from typing import Dict, List, Optional, Tuple
+from scipy.spatial import KDTree
+from shapely.geometry import Polygon, MultiPoint, shape
 
+from .dcel import DCEL
 from .voronoi_engine import VoronoiEngine
-from .routing_service import get_routing_service, RoutingService
+from .routing_service import get_routing_service, RoutingService, RoadDistanceCache, RouteResult
 
 logger = logging.getLogger(__name__)
 
+# Grid sampling for the weighted cells: the coarse grid spacing gives about
+# this many samples per facility inside the boundary, capped in total
+GRID_POINTS_PER_FACILITY = 400
+MAX_GRID_POINTS = 250_000
+
+# Grid points per task when assigning them to facilities on a thread pool
+ASSIGN_CHUNK_SIZE = 8192
+
 
 @dataclass
 class WeightedVoronoiConfig:
     """Configuration for weighted Voronoi computation."""
     num_neighbor_samples: int = 5  # How many neighbors to sample for penalty calculation
     penalty_scale: float = 1.0  # Scale factor for road penalty
+    max_concurrent_queries: int = 32  # In-flight OSRM requests in the penalty pass
+    penalty_cache_version: int = 1  # Bump to ignore road distances cached on disk
+    max_table_coordinates: int = 100  # Fetch all penalties in one OSRM table query up to this size (OSRM --max-table-size)
 
 
 @dataclass
@@ -43,6 +61,19 @@ class WeightedVoronoiResult:
     metadata: Dict = field(default_factory=dict)
 
 
+@dataclass
+class _FacilityIndex:
+    """A request's facilities as arrays, with one KDTree shared by Steps 2 and 3."""
+    facility_ids: List[str]
+    lnglat: np.ndarray  # (N, 2) of (lng, lat), in facility_ids order
+    lng_scale: float  # cos(mean latitude), so both tree axes are roughly equal length
+    tree: KDTree  # Over scaled() of lnglat
+    
+    def scaled(self, lngs: np.ndarray, lats: np.ndarray) -> np.ndarray:
+        """Points in the tree's coordinate space."""
+        return np.column_stack([lngs * self.lng_scale, lats])
+
+
 class WeightedVoronoiEngine:
     """
     Computes additive weighted Voronoi diagrams.
@@ -58,9 +89,17 @@ class WeightedVoronoiEngine:
     because increasing distance to a facility shrinks its Voronoi cell.
     """
     
-    def __init__(self, voronoi_engine: Optional[VoronoiEngine] = None, routing_service: Optional[RoutingService] = None):
+    def __init__(
+        self,
+        voronoi_engine: Optional[VoronoiEngine] = None,
+        routing_service: Optional[RoutingService] = None,
+        distance_cache: Optional[RoadDistanceCache] = None
+    ):
         self.voronoi_engine = voronoi_engine or VoronoiEngine()
         self.routing = routing_service or get_routing_service()
+        self.distance_cache = distance_cache or RoadDistanceCache(
+            self.routing.config.distance_cache_path
+        )
     
     def compute(
         self,
@@ -84,18 +123,85 @@ class WeightedVoronoiEngine:
         start_time = time.time()
         config = config or WeightedVoronoiConfig()
         
+        geojson, dcel, filtered_facilities, filtered_facility_ids = self._compute_euclidean_step(
+            facilities, clip_to_india, state_filter
+        )
+        
+        index = self._facility_index(facilities)
+        members = self._member_positions(index, filtered_facility_ids)
+        
+        # Step 2: Compute road penalties only for facilities with cells
+        step2_start = time.time()
+        penalties, query_count = self._compute_road_penalties(index, members, config)
+        logger.info(
+            f"[Step 2/4] Road penalties for {len(filtered_facility_ids)} facilities: "
+            f"{time.time() - step2_start:.2f}s, {query_count} queries"
+        )
+        
+        return self._compute_weighted_step(
+            facilities, index, len(members), geojson, penalties, query_count,
+            clip_to_india, state_filter, config, start_time
+        )
+    
+    async def compute_async(
+        self,
+        facilities: List[Dict],
+        clip_to_india: bool = True,
+        state_filter: Optional[str] = None,
+        config: Optional[WeightedVoronoiConfig] = None
+    ) -> WeightedVoronoiResult:
+        """
+        Same as compute(), but issues all road penalty queries concurrently
+        through the routing service's pooled async client.
+        
+        The CPU-bound steps and the disk cache access run in worker threads,
+        so the event loop keeps serving other requests meanwhile.
+        """
+        start_time = time.time()
+        config = config or WeightedVoronoiConfig()
+        
+        geojson, dcel, filtered_facilities, filtered_facility_ids = await asyncio.to_thread(
+            self._compute_euclidean_step, facilities, clip_to_india, state_filter
+        )
+        
+        index = await asyncio.to_thread(self._facility_index, facilities)
+        members = self._member_positions(index, filtered_facility_ids)
+        
+        # Step 2: Compute road penalties only for facilities with cells
+        step2_start = time.time()
+        penalties, query_count = await self._compute_road_penalties_async(index, members, config)
+        logger.info(
+            f"[Step 2/4] Road penalties for {len(filtered_facility_ids)} facilities: "
+            f"{time.time() - step2_start:.2f}s, {query_count} queries"
+        )
+        
+        return await asyncio.to_thread(
+            self._compute_weighted_step,
+            facilities, index, len(members), geojson, penalties, query_count,
+            clip_to_india, state_filter, config, start_time
+        )
+    
+    def _compute_euclidean_step(
+        self,
+        facilities: List[Dict],
+        clip_to_india: bool,
+        state_filter: Optional[str]
+    ) -> Tuple[Dict, DCEL, List[Dict], List[str]]:
+        """
+        Step 1: Euclidean Voronoi and the facilities that have a cell in it.
+        
+        Repeated inputs (e.g. when only penalty_scale changes between requests)
+        hit the Voronoi engine's cell cache, but each call still gets its own
+        GeoJSON and DCEL.
+        
+        Returns (geojson, dcel, filtered_facilities, filtered_facility_ids).
+        """
         if len(facilities) < 3:
             raise ValueError("Need at least 3 facilities")
         
-        print(f"\n{'='*60}", flush=True)
-        print(f"WEIGHTED VORONOI: {len(facilities)} facilities", flush=True)
-        print(f"{'='*60}", flush=True)
-        
-        # Build facility map
-        facility_map = {f.get("id", str(i)): f for i, f in enumerate(facilities)}
+        logger.info(f"Weighted Voronoi: {len(facilities)} facilities")
         
         # Step 1: Compute Euclidean Voronoi to get adjacency
-        print(f"\n[Step 1/4] Computing Euclidean Voronoi...", flush=True)
         step1_start = time.time()
         
         coords = [(f["lng"], f["lat"]) for f in facilities]
@@ -128,39 +234,58 @@ class WeightedVoronoiEngine:
                 filtered_facilities.append(f)
                 filtered_facility_ids.append(fid)
         
-        print(f"  Done in {time.time() - step1_start:.2f}s ({len(filtered_facility_ids)} cells in state)", flush=True)
+        logger.info(
+            f"[Step 1/4] Euclidean Voronoi: {time.time() - step1_start:.2f}s "
+            f"({len(filtered_facility_ids)} cells in state)"
+        )
         
-        # Step 2: Compute road penalties only for facilities with cells
-        print(f"\n[Step 2/4] Computing road penalties for {len(filtered_facility_ids)} facilities...", flush=True)
-        step2_start = time.time()
-        penalties, query_count = self._compute_road_penalties(
-            filtered_facilities, filtered_facility_ids, dcel, config
+        return geojson, dcel, filtered_facilities, filtered_facility_ids
+    
+    def _compute_weighted_step(
+        self,
+        facilities: List[Dict],
+        index: _FacilityIndex,
+        num_members: int,
+        geojson: Dict,
+        penalties: Dict[str, float],
+        query_count: int,
+        clip_to_india: bool,
+        state_filter: Optional[str],
+        config: WeightedVoronoiConfig,
+        start_time: float
+    ) -> WeightedVoronoiResult:
+        """
+        Steps 3 and 4: weighted cells from the penalties, and the final result.
+        
+        num_members is how many facilities have a cell inside the boundary.
+        """
+        facility_map = {f.get("id", str(i)): f for i, f in enumerate(facilities)}
+        # Penalty defaults to 0 for facilities outside the state
+        penalty_arr = np.array(
+            [penalties.get(fid, 0) for fid in index.facility_ids], dtype=np.float64
         )
-        print(f"  Done in {time.time() - step2_start:.2f}s, {query_count} queries", flush=True)
         
         # Step 3: Compute weighted Voronoi by shifting facility positions
-        print(f"\n[Step 3/4] Computing weighted Voronoi...", flush=True)
         step3_start = time.time()
         
-        # Get boundary
-        if state_filter:
-            boundary = self.voronoi_engine._get_state_boundary_wgs84(state_filter)
-        elif clip_to_india:
-            boundary = VoronoiEngine._india_boundary_wgs84
+        boundary = self._get_boundary(index.lnglat, clip_to_india, state_filter)
+        if np.ptp(penalty_arr) == 0:
+            # Equal additive weights cancel out, so the cells are exactly the
+            # Euclidean ones from Step 1 (e.g. when OSRM returned no routes)
+            weighted_geojson = self._euclidean_cells(geojson, boundary)
         else:
-            boundary = MultiPoint(coords).convex_hull.buffer(0.5)
-        
-        weighted_geojson = self._compute_weighted_voronoi(
-            facilities, facility_ids, penalties, boundary, config
-        )
-        print(f"  Done in {time.time() - step3_start:.2f}s", flush=True)
+            weighted_geojson = self._compute_weighted_voronoi(
+                index, penalty_arr, boundary, config, num_members
+            )
+        logger.info(f"[Step 3/4] Weighted Voronoi: {time.time() - step3_start:.2f}s")
         
         # Step 4: Build features with original properties
-        print(f"\n[Step 4/4] Building output features...", flush=True)
         step4_start = time.time()
         
+        areas = self._calculate_areas_km2(list(weighted_geojson.values()))
+        
         features = []
-        for fid, poly in weighted_geojson.items():
+        for (fid, poly), area in zip(weighted_geojson.items(), areas.tolist()):
             fac = facility_map.get(fid, {})
             penalty = penalties.get(fid, 0)
             
@@ -179,14 +304,15 @@ class WeightedVoronoiEngine:
                     "name": fac.get("name", fid),
                     "cell_type": "weighted_road",
                     "road_penalty_km": round(penalty / 1000, 2),
-                    "area_sq_km": self._calculate_area_km2(poly),
+                    "area_sq_km": area,
                 },
                 "geometry": self._polygon_to_geojson(poly)
             }
             features.append(feature)
         
-        print(f"  Built {len(features)} weighted cells", flush=True)
-        print(f"  Done in {time.time() - step4_start:.2f}s", flush=True)
+        logger.info(
+            f"[Step 4/4] Built {len(features)} weighted cells: {time.time() - step4_start:.2f}s"
+        )
         
         computation_time = time.time() - start_time
         
@@ -202,93 +328,403 @@ class WeightedVoronoiEngine:
             }
         )
         
-        print(f"\n{'='*60}", flush=True)
-        print(f"COMPLETE: {computation_time:.2f}s, {query_count} queries, {len(features)} cells", flush=True)
-        print(f"{'='*60}\n", flush=True)
+        logger.info(
+            f"Weighted Voronoi complete: {computation_time:.2f}s, "
+            f"{query_count} queries, {len(features)} cells"
+        )
         
         return result
     
+    def _get_boundary(
+        self,
+        lnglat: np.ndarray,
+        clip_to_india: bool,
+        state_filter: Optional[str]
+    ) -> Polygon:
+        """
+        Boundary the weighted cells are sampled in and clipped to.
+        
+        State and India boundaries come from VoronoiEngine's class-level cache,
+        loaded and prepared once per process. The facility hull used otherwise
+        is prepared here, so contains_xy on the grid never sees an unprepared
+        geometry.
+        """
+        boundary = None
+        if state_filter:
+            boundary = self.voronoi_engine._get_state_boundary_wgs84(state_filter)
+        elif clip_to_india:
+            boundary = VoronoiEngine._india_boundary_wgs84
+        
+        if boundary is None:
+            # Unclipped request, or no boundary file is available
+            boundary = MultiPoint(lnglat).convex_hull.buffer(0.5)
+        shapely.prepare(boundary)
+        return boundary
+    
     def _compute_road_penalties(
         self,
-        facilities: List[Dict],
-        facility_ids: List[str],
-        dcel,
+        index: _FacilityIndex,
+        members: np.ndarray,
         config: WeightedVoronoiConfig
     ) -> Tuple[Dict[str, float], int]:
         """
-        Compute road penalty for each facility.
+        Compute road penalty for each member facility (positions in index).
         
         Penalty = average(road_distance - euclidean_distance) to nearest neighbors.
         Positive penalty = poor road access = smaller cell.
         """
-        penalties = {}
+        samples, lookups = self._penalty_lookups(index, members, config)
+        
+        table = self._penalty_table_request(samples, lookups, config)
+        if table is not None:
+            pending, origins, destinations = table
+            try:
+                distances, durations = self.routing.batch_matrix_sync(origins, destinations)
+                self._store_table(samples, lookups, pending, destinations, distances, durations, config)
+            except Exception as e:
+                logger.debug(f"Penalty table query failed: {e}")
+            return self._penalties_from_lookups(samples, lookups, config), 1
+        
         total_queries = 0
+        count_lock = threading.Lock()
         
-        # Build facility coordinate lookup
-        fac_coords = {
-            f.get("id", str(i)): (f["lat"], f["lng"]) 
-            for i, f in enumerate(facilities)
-        }
+        def query(sample, lookup):
+            nonlocal total_queries
+            fid, lat, lng, neighbor_locs, _ = sample
+            results, missing = lookup
+            if missing:
+                try:
+                    # Query road distances to all uncached neighbors in one batch
+                    fetched = self.routing.batch_distance_sync(
+                        lat, lng, [neighbor_locs[j] for j in missing]
+                    )
+                    with count_lock:
+                        total_queries += 1
+                    self._store_distances(results, missing, fetched, config)
+                except Exception as e:
+                    logger.debug(f"Batch penalty query failed for {fid}: {e}")
         
-        for i, fid in enumerate(facility_ids):
-            lat, lng = fac_coords[fid]
-            
-            print(f"  Facility {i+1}/{len(facility_ids)}: {fid[:12]}... ", end="", flush=True)
-            
-            # Find nearest neighbors by Euclidean distance
-            distances = []
-            for other_fid in facility_ids:
-                if other_fid == fid:
-                    continue
-                other_lat, other_lng = fac_coords[other_fid]
-                euc_dist = self._euclidean_distance_meters(lat, lng, other_lat, other_lng)
-                distances.append((other_fid, euc_dist))
-            
-            # Sort by Euclidean distance and take nearest N
-            distances.sort(key=lambda x: x[1])
-            neighbors = distances[:config.num_neighbor_samples]
-            
-            # Query road distances to all neighbors in one batch
-            neighbor_locs = []
-            neighbor_euc_dists = []
-            for other_fid, euc_dist in neighbors:
-                other_lat, other_lng = fac_coords[other_fid]
-                neighbor_locs.append((other_lat, other_lng))
-                neighbor_euc_dists.append(euc_dist)
-            
-            penalty_samples = []
-            if neighbor_locs:
+        # Threads spend their time waiting on OSRM, so keep several batches in flight
+        with ThreadPoolExecutor(max_workers=config.max_concurrent_queries) as executor:
+            list(executor.map(query, samples, lookups))
+        
+        return self._penalties_from_lookups(samples, lookups, config), total_queries
+    
+    async def _compute_road_penalties_async(
+        self,
+        index: _FacilityIndex,
+        members: np.ndarray,
+        config: WeightedVoronoiConfig
+    ) -> Tuple[Dict[str, float], int]:
+        """
+        Async version of _compute_road_penalties: every facility's batch
+        query is in flight at once (bounded by config.max_concurrent_queries),
+        so the stage costs a few round trips instead of one per facility.
+        Neighbor search and the sqlite cache run in worker threads.
+        """
+        samples, lookups = await asyncio.to_thread(
+            self._penalty_lookups, index, members, config
+        )
+        
+        table = self._penalty_table_request(samples, lookups, config)
+        if table is not None:
+            pending, origins, destinations = table
+            try:
+                distances, durations = await self.routing.batch_matrix(origins, destinations)
+                await asyncio.to_thread(
+                    self._store_table, samples, lookups, pending, destinations,
+                    distances, durations, config
+                )
+            except Exception as e:
+                logger.debug(f"Penalty table query failed: {e}")
+            return self._penalties_from_lookups(samples, lookups, config), 1
+        
+        semaphore = asyncio.Semaphore(config.max_concurrent_queries)
+        total_queries = 0
+        
+        async def query(fid, lat, lng, neighbor_locs, lookup):
+            nonlocal total_queries
+            results, missing = lookup
+            if not missing:
+                return
+            async with semaphore:
                 try:
-                    results = self.routing.batch_distance_sync(lat, lng, neighbor_locs)
+                    fetched = await self.routing.batch_distance(
+                        lat, lng, [neighbor_locs[j] for j in missing]
+                    )
                     total_queries += 1
-                    
-                    for res, euc_dist in zip(results, neighbor_euc_dists):
-                        if res.connected:
-                            # Penalty = how much longer road is than Euclidean
-                            road_dist_m = res.distance_km * 1000
-                            penalty = road_dist_m - euc_dist
-                            penalty_samples.append(penalty)
+                    await asyncio.to_thread(self._store_distances, results, missing, fetched, config)
                 except Exception as e:
                     logger.debug(f"Batch penalty query failed for {fid}: {e}")
+        
+        await asyncio.gather(*[
+            query(fid, lat, lng, neighbor_locs, lookup)
+            for (fid, lat, lng, neighbor_locs, _), lookup in zip(samples, lookups)
+        ])
+        
+        return self._penalties_from_lookups(samples, lookups, config), total_queries
+    
+    def _cached_distances(
+        self,
+        lat: float,
+        lng: float,
+        neighbor_locs: List[Tuple[float, float]],
+        config: WeightedVoronoiConfig
+    ) -> Tuple[List, List[int]]:
+        """
+        Road distances to the neighbors already on disk.
+        
+        Returns the per-neighbor results (None where unknown) and the indices
+        of the neighbors that still need an OSRM query.
+        """
+        results = self.distance_cache.get_many(
+            config.penalty_cache_version, (lat, lng), neighbor_locs
+        )
+        missing = [j for j, res in enumerate(results) if res is None]
+        return results, missing
+    
+    def _penalty_lookups(
+        self,
+        index: _FacilityIndex,
+        members: np.ndarray,
+        config: WeightedVoronoiConfig
+    ) -> Tuple[List[Tuple], List[Tuple[List, List[int]]]]:
+        """Penalty samples for each member and their disk-cached distances."""
+        samples = self._penalty_neighbors(index, members, config)
+        lookups = [
+            self._cached_distances(lat, lng, neighbor_locs, config)
+            for _, lat, lng, neighbor_locs, _ in samples
+        ]
+        return samples, lookups
+    
+    def _penalty_table_request(
+        self,
+        samples: List[Tuple],
+        lookups: List[Tuple[List, List[int]]],
+        config: WeightedVoronoiConfig
+    ) -> Optional[Tuple[List[int], List[Tuple[float, float]], List[Tuple[float, float]]]]:
+        """
+        Origins and destinations for fetching every uncached pair in one OSRM
+        table query, or None if nothing is missing or it wouldn't fit.
+        
+        Returns (pending sample indices, origins, destinations).
+        """
+        pending = [i for i, (_, missing) in enumerate(lookups) if missing]
+        if not pending:
+            return None
+        
+        origins = [(samples[i][1], samples[i][2]) for i in pending]
+        destinations = list(dict.fromkeys(
+            samples[i][3][j] for i in pending for j in lookups[i][1]
+        ))
+        if len(origins) + len(destinations) > config.max_table_coordinates:
+            return None
+        return pending, origins, destinations
+    
+    def _store_table(
+        self,
+        samples: List[Tuple],
+        lookups: List[Tuple[List, List[int]]],
+        pending: List[int],
+        destinations: List[Tuple[float, float]],
+        distances: np.ndarray,
+        durations: np.ndarray,
+        config: WeightedVoronoiConfig
+    ):
+        """Fill each pending sample's missing results from a table query's matrices."""
+        column = {dest: c for c, dest in enumerate(destinations)}
+        for row, i in enumerate(pending):
+            _, lat, lng, neighbor_locs, _ = samples[i]
+            results, missing = lookups[i]
+            fetched = []
+            for j in missing:
+                c = column[neighbor_locs[j]]
+                connected = bool(np.isfinite(distances[row, c]))
+                fetched.append(RouteResult(
+                    origin=(lat, lng),
+                    destination=neighbor_locs[j],
+                    distance_km=float(distances[row, c]),
+                    duration_min=float(durations[row, c]),
+                    connected=connected,
+                    error=None if connected else "No route found"
+                ))
+            self._store_distances(results, missing, fetched, config)
+    
+    def _penalties_from_lookups(
+        self,
+        samples: List[Tuple],
+        lookups: List[Tuple[List, List[int]]],
+        config: WeightedVoronoiConfig
+    ) -> Dict[str, float]:
+        """Penalty per facility from its (now filled) neighbor results."""
+        penalties = {}
+        for i, ((fid, _, _, _, neighbor_euc_dists), (results, _)) in enumerate(zip(samples, lookups)):
+            penalties[fid] = self._penalty_from_results(
+                i, len(samples), fid, results, neighbor_euc_dists, config
+            )
+        return penalties
+    
+    def _store_distances(
+        self,
+        results: List,
+        missing: List[int],
+        fetched: List,
+        config: WeightedVoronoiConfig
+    ):
+        """Fill the fetched results into their slots and write them back to disk."""
+        for j, res in zip(missing, fetched):
+            results[j] = res
+        self.distance_cache.put_many(config.penalty_cache_version, fetched)
+    
+    def _facility_index(self, facilities: List[Dict]) -> _FacilityIndex:
+        """Coordinate arrays and the shared KDTree for all of a request's facilities."""
+        lnglat = np.array(
+            [(f["lng"], f["lat"]) for f in facilities], dtype=np.float64
+        ).reshape(len(facilities), 2)
+        lng_scale = float(np.cos(np.radians(lnglat[:, 1].mean())))
+        return _FacilityIndex(
+            facility_ids=[f.get("id", str(i)) for i, f in enumerate(facilities)],
+            lnglat=lnglat,
+            lng_scale=lng_scale,
+            tree=KDTree(np.column_stack([lnglat[:, 0] * lng_scale, lnglat[:, 1]]))
+        )
+    
+    def _member_positions(self, index: _FacilityIndex, member_ids: List[str]) -> np.ndarray:
+        """Positions in index of the facilities whose ids are in member_ids."""
+        member_set = set(member_ids)
+        return np.array(
+            [i for i, fid in enumerate(index.facility_ids) if fid in member_set], dtype=np.int64
+        )
+    
+    def _nearest_members(
+        self,
+        index: _FacilityIndex,
+        members: np.ndarray,
+        count: int
+    ) -> np.ndarray:
+        """
+        The count nearest members (in tree space) of each member, as an
+        (n_members, count) array of positions in index, self included.
+        
+        The shared tree also holds non-members, so rows that didn't get
+        enough members back are re-queried with twice the k.
+        """
+        total = len(index.facility_ids)
+        is_member = np.zeros(total, dtype=bool)
+        is_member[members] = True
+        points = index.scaled(index.lnglat[members, 0], index.lnglat[members, 1])
+        
+        result = np.empty((len(members), count), dtype=np.int64)
+        rows = np.arange(len(members))
+        k = count
+        while len(rows) > 0:
+            k = min(k, total)
+            _, indices = index.tree.query(points[rows], k=k, workers=-1)
+            indices = indices.reshape(len(rows), k)
+            found = is_member[indices]
+            # With k == total every member is in the row, so the loop ends
+            enough = (found.sum(axis=1) >= count) | (k == total)
             
-            # Average penalty
-            if penalty_samples:
-                avg_penalty = sum(penalty_samples) / len(penalty_samples)
-                penalties[fid] = avg_penalty * config.penalty_scale
-                print(f"penalty={avg_penalty/1000:.1f}km", flush=True)
+            # First `count` member entries of each row, keeping distance order
+            order = np.argsort(~found, axis=1, kind="stable")[:, :count]
+            result[rows[enough]] = np.take_along_axis(indices, order, axis=1)[enough]
+            rows = rows[~enough]
+            k *= 2
+        return result
+    
+    def _penalty_neighbors(
+        self,
+        index: _FacilityIndex,
+        members: np.ndarray,
+        config: WeightedVoronoiConfig
+    ) -> List[Tuple[str, float, float, List[Tuple[float, float]], List[float]]]:
+        """
+        Pick the nearest neighbors (by Euclidean distance) whose road distance
+        each member facility's penalty is sampled from. Neighbors are members too.
+        
+        Returns (fid, lat, lng, neighbor_locs, neighbor_euc_dists) per member.
+        """
+        all_lngs, all_lats = index.lnglat[:, 0], index.lnglat[:, 1]
+        lngs, lats = all_lngs[members], all_lats[members]
+        n = len(members)
+        num_neighbors = min(config.num_neighbor_samples, n - 1)
+        
+        if num_neighbors > 0:
+            # One batched k-NN query on the shared tree, with spare candidates
+            # so re-ranking by exact metres (which uses each pair's
+            # mid-latitude) still finds the true nearest
+            indices = self._nearest_members(index, members, min(2 * num_neighbors + 1, n))
+            
+            dists = self._euclidean_distance_meters(
+                lats[:, None], lngs[:, None], all_lats[indices], all_lngs[indices]
+            )
+            dists[indices == members[:, None]] = np.inf  # Skip self
+            
+            order = np.argsort(dists, axis=1, kind="stable")[:, :num_neighbors]
+            neighbor_idx = np.take_along_axis(indices, order, axis=1)
+            neighbor_dists = np.take_along_axis(dists, order, axis=1)
+        
+        # (lat, lng) tuples of Python floats, as the routing service takes them
+        latlng = list(zip(all_lats.tolist(), all_lngs.tolist()))
+        samples = []
+        for i, m in enumerate(members.tolist()):
+            fid = index.facility_ids[m]
+            lat, lng = latlng[m]
+            if num_neighbors > 0:
+                neighbor_locs = [latlng[j] for j in neighbor_idx[i].tolist()]
+                neighbor_euc_dists = neighbor_dists[i].tolist()
             else:
-                penalties[fid] = 0
-                print(f"penalty=0 (no road data)", flush=True)
+                neighbor_locs, neighbor_euc_dists = [], []
+            samples.append((fid, lat, lng, neighbor_locs, neighbor_euc_dists))
+        
+        return samples
+    
+    def _penalty_from_results(
+        self,
+        i: int,
+        count: int,
+        fid: str,
+        results,
+        neighbor_euc_dists: List[float],
+        config: WeightedVoronoiConfig
+    ) -> float:
+        """Average (road - Euclidean) distance over the connected neighbor routes."""
+        penalty_samples = []
+        for res, euc_dist in zip(results, neighbor_euc_dists):
+            if res is not None and res.connected:
+                # Penalty = how much longer road is than Euclidean
+                road_dist_m = res.distance_km * 1000
+                penalty_samples.append(road_dist_m - euc_dist)
+        
+        # Average penalty
+        if penalty_samples:
+            avg_penalty = sum(penalty_samples) / len(penalty_samples)
+            logger.debug("Facility %d/%d: %s penalty=%.1fkm", i + 1, count, fid[:12], avg_penalty / 1000)
+            return avg_penalty * config.penalty_scale
+        
+        logger.debug("Facility %d/%d: %s penalty=0 (no road data)", i + 1, count, fid[:12])
+        return 0
+    
+    def _euclidean_cells(self, geojson: Dict, boundary: Polygon) -> Dict[str, Polygon]:
+        """Step 1's Voronoi cells, clipped to the weighted boundary, by facility id."""
+        fids = []
+        cells = []
+        for feat in geojson.get("features", []):
+            fid = feat.get("properties", {}).get("facility_id")
+            if fid and feat.get("geometry"):
+                fids.append(fid)
+                cells.append(shape(feat["geometry"]))
         
-        return penalties, total_queries
+        clipped = shapely.intersection(np.array(cells, dtype=object), boundary)
+        return {fid: cell for fid, cell in zip(fids, clipped) if not cell.is_empty}
     
     def _compute_weighted_voronoi(
         self,
-        facilities: List[Dict],
-        facility_ids: List[str],
-        penalties: Dict[str, float],
+        index: _FacilityIndex,
+        penalty_arr: np.ndarray,
         boundary: Polygon,
-        config: WeightedVoronoiConfig
+        config: WeightedVoronoiConfig,
+        num_members: int
     ) -> Dict[str, Polygon]:
         """
         Compute weighted Voronoi by shifting facility positions.
@@ -304,81 +740,165 @@ class WeightedVoronoiEngine:
         # Method: Dense grid sampling with weighted distance
         # This is more reliable than trying to compute analytic weighted Voronoi
         
-        minx, miny, maxx, maxy = boundary.bounds
-        
-        # Create dense grid
-        grid_size = 100  # 100x100 grid
-        x_coords = np.linspace(minx, maxx, grid_size)
-        y_coords = np.linspace(miny, maxy, grid_size)
-        
-        # Build lookup and KDTree for Euclidean distance optimization
-        fac_coords = {
-            f.get("id", str(i)): (f["lat"], f["lng"]) 
-            for i, f in enumerate(facilities)
-        }
-        
-        fac_coords_list = []
-        for fid in facility_ids:
-            fac_lat, fac_lng = fac_coords[fid]
-            fac_coords_list.append([fac_lng, fac_lat])
+        facility_ids = index.facility_ids
+        # The (points, k) distance arithmetic runs in float32: half the memory
+        # traffic of float64, and ~0.5 m error is far below the pixel size
+        fac_lngs = index.lnglat[:, 0].astype(np.float32)
+        fac_lats = index.lnglat[:, 1].astype(np.float32)
+        penalty_f32 = penalty_arr.astype(np.float32)
+        # Only check the 20 nearest facilities by Euclidean distance;
+        # the weighted neighbor is extremely likely to be among them
+        k = min(20, len(facility_ids))
+        
+        def assign_chunk(xs, ys, workers=1):
+            """Index of the facility with the least weighted distance per point."""
+            _, indices = index.tree.query(index.scaled(xs, ys), k=k, workers=workers)
+            indices = indices.reshape(len(xs), k)
+            xs, ys = xs.astype(np.float32), ys.astype(np.float32)
+            # Candidates are the nearest few facilities, so the point's own
+            # latitude stands in for each pair's mid-latitude (one cos per point)
+            weighted_dist = self._euclidean_distance_meters(
+                ys[:, None], xs[:, None], fac_lats[indices], fac_lngs[indices],
+                cos_lat=np.cos(np.radians(ys))[:, None]
+            ) + penalty_f32[indices]
+            return indices[np.arange(len(xs)), weighted_dist.argmin(axis=1)]
+        
+        def assign(xs, ys):
+            """
+            assign_chunk over cache-sized chunks on a thread pool. NumPy and
+            the tree query release the GIL, and each chunk's (points, k)
+            temporaries stay small.
+            """
+            n = len(xs)
+            if n <= ASSIGN_CHUNK_SIZE:
+                # workers=-1 spreads the batched tree walk over all cores
+                return assign_chunk(xs, ys, workers=-1)
             
-        tree = KDTree(fac_coords_list)
-        
-        # Assign each grid point to facility with min weighted distance
-        assignments = {}  # fid -> list of (x, y) points
-        
-        for x in x_coords:
-            for y in y_coords:
-                point = Point(x, y)
-                if not boundary.contains(point):
-                    continue
-                
-                # OPTIMIZATION: Only check top 20 nearest neighbors by Euclidean distance
-                # The weighted neighbor is extremely likely to be among them
-                dists, indices = tree.query([x, y], k=min(20, len(facility_ids)))
-                
-                min_dist = float('inf')
-                best_fid = None
-                
-                for idx in indices:
-                    fid = facility_ids[idx]
-                    fac_lat, fac_lng = fac_coords[fid]
-                    
-                    # Use accurate Euclidean distance in meters
-                    euc_dist_m = self._euclidean_distance_meters(y, x, fac_lat, fac_lng)
-                    
-                    # Add penalty (defaults to 0 for facilities outside the state)
-                    penalty = penalties.get(fid, 0)
-                    weighted_dist = euc_dist_m + penalty
-                    
-                    if weighted_dist < min_dist:
-                        min_dist = weighted_dist
-                        best_fid = fid
-                
-                if best_fid:
-                    if best_fid not in assignments:
-                        assignments[best_fid] = []
-                    assignments[best_fid].append((x, y))
-        
-        # Convert point assignments to polygons using alpha shapes / convex hull
-        result = {}
-        for fid, points in assignments.items():
-            if len(points) < 3:
+            starts = range(0, n, ASSIGN_CHUNK_SIZE)
+            
+            def run(start):
+                end = start + ASSIGN_CHUNK_SIZE
+                return assign_chunk(xs[start:end], ys[start:end])
+            
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                return np.concatenate(list(executor.map(run, starts)))
+        
+        # Coarse grid, sized from the boundary's area rather than its
+        # bounding box so thin states aren't mostly empty samples. Only the
+        # facilities inside the boundary count: a state of a national dataset
+        # needs samples for its own few cells, not for every facility
+        bounds = boundary.bounds
+        minx, miny, maxx, maxy = bounds
+        spacing = self._grid_spacing(boundary.area, bounds, max(num_members, 1))
+        nx = max(1, math.ceil((maxx - minx) / spacing))
+        ny = max(1, math.ceil((maxy - miny) / spacing))
+        x_edges = minx + np.arange(nx + 1) * spacing
+        y_edges = miny + np.arange(ny + 1) * spacing
+        
+        # All pixel centres at once (x-major), keeping only those inside the
+        # boundary (prepared by _get_boundary, so contains_xy uses its index)
+        grid_x, grid_y = np.meshgrid(
+            (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2, indexing="ij"
+        )
+        inside = shapely.contains_xy(boundary, grid_x, grid_y)
+        if not inside.any():
+            return {}
+        
+        coarse = np.full((nx, ny), -1, dtype=np.int64)
+        coarse[inside] = assign(grid_x[inside], grid_y[inside])
+        
+        # Edge pixels: those whose 3x3 neighbourhood disagrees on the facility
+        padded = np.pad(coarse, 1, constant_values=-1)
+        edge = np.zeros((nx, ny), dtype=bool)
+        for dx in (0, 1, 2):
+            for dy in (0, 1, 2):
+                neighbour = padded[dx:dx + nx, dy:dy + ny]
+                edge |= (neighbour >= 0) & (neighbour != coarse)
+        edge &= inside
+        
+        # Refine edge pixels by sampling their four half-spacing sub-pixels.
+        # Even fine edges are the coarse edges themselves, so both layers line up.
+        fine_x_edges = np.empty(2 * nx + 1)
+        fine_x_edges[0::2] = x_edges
+        fine_x_edges[1::2] = (x_edges[:-1] + x_edges[1:]) / 2
+        fine_y_edges = np.empty(2 * ny + 1)
+        fine_y_edges[0::2] = y_edges
+        fine_y_edges[1::2] = (y_edges[:-1] + y_edges[1:]) / 2
+        
+        ex, ey = np.nonzero(edge)
+        sub_x = (2 * ex[:, None] + np.array([0, 0, 1, 1])).ravel()
+        sub_y = (2 * ey[:, None] + np.array([0, 1, 0, 1])).ravel()
+        sub_labels = assign(
+            (fine_x_edges[sub_x] + fine_x_edges[sub_x + 1]) / 2,
+            (fine_y_edges[sub_y] + fine_y_edges[sub_y + 1]) / 2
+        ) if len(sub_x) > 0 else np.empty(0, dtype=np.int64)
+        
+        cx, cy = np.nonzero(inside & ~edge)
+        layers = [
+            (coarse[cx, cy], shapely.box(x_edges[cx], y_edges[cy], x_edges[cx + 1], y_edges[cy + 1])),
+            (sub_labels, shapely.box(
+                fine_x_edges[sub_x], fine_y_edges[sub_y], fine_x_edges[sub_x + 1], fine_y_edges[sub_y + 1]
+            )),
+        ]
+        return self._label_cells(layers, facility_ids, boundary)
+    
+    def _grid_spacing(
+        self,
+        area: float,
+        bounds: Tuple[float, float, float, float],
+        num_facilities: int
+    ) -> float:
+        """Coarse grid spacing (degrees) for about GRID_POINTS_PER_FACILITY samples each."""
+        minx, miny, maxx, maxy = bounds
+        bbox_area = (maxx - minx) * (maxy - miny)
+        spacing = math.sqrt(area / (num_facilities * GRID_POINTS_PER_FACILITY))
+        # Never more than MAX_GRID_POINTS coarse points over the bounding box
+        spacing = max(spacing, math.sqrt(bbox_area / MAX_GRID_POINTS))
+        if spacing <= 0:
+            # Degenerate boundary: fall back to 100 steps along the longer side
+            spacing = max(maxx - minx, maxy - miny, 1e-6) / 100
+        return spacing
+    
+    def _label_cells(
+        self,
+        layers: List[Tuple[np.ndarray, np.ndarray]],
+        facility_ids: List[str],
+        boundary: Polygon
+    ) -> Dict[str, Polygon]:
+        """
+        Turn labelled grid pixels into one polygon per facility.
+        
+        Each layer is (facility index per pixel, pixel boxes) for pixels of one
+        size. A facility's cell is the union of its pixels, clipped to the
+        boundary - unlike a convex hull of its points, cells don't overlap and
+        keep their shape.
+        """
+        pieces: Dict[int, List[Polygon]] = {}
+        for labels, pixels in layers:
+            if len(labels) == 0:
                 continue
+            # Group pixels by facility
+            order = np.argsort(labels, kind="stable")
+            groups, starts = np.unique(labels[order], return_index=True)
+            pixel_groups = np.split(pixels[order], starts[1:])
             
-            try:
-                # Use convex hull for simplicity (alpha shapes would be better)
-                mp = MultiPoint(points)
-                hull = mp.convex_hull
-                
-                # Clip to boundary
-                clipped = hull.intersection(boundary)
-                
-                if not clipped.is_empty:
-                    result[fid] = clipped
-            except Exception as e:
-                logger.warning(f"Failed to create polygon for {fid}: {e}")
+            # Same-size adjacent pixels share exact edges, so the cheap
+            # coverage union applies within a layer
+            for g, group in zip(groups.tolist(), pixel_groups):
+                pieces.setdefault(g, []).append(shapely.coverage_union_all(group))
+        
+        # Layers meet along edges with T-junctions, which needs a full union
+        indices = list(pieces)
+        cells = np.array([
+            parts[0] if len(parts) == 1 else shapely.union_all(parts)
+            for parts in pieces.values()
+        ])
+        clipped = shapely.intersection(cells, boundary)
         
+        result = {}
+        for g, cell in zip(indices, clipped):
+            if not cell.is_empty:
+                result[facility_ids[g]] = cell
         return result
     
     def _query_road_distance(
@@ -398,23 +918,40 @@ class WeightedVoronoiEngine:
             return None
     
     def _euclidean_distance_meters(
-        self, lat1: float, lng1: float, lat2: float, lng2: float
-    ) -> float:
-        """Calculate approximate Euclidean distance in meters."""
+        self,
+        lat1: np.ndarray,
+        lng1: np.ndarray,
+        lat2: np.ndarray,
+        lng2: np.ndarray,
+        cos_lat: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Calculate approximate Euclidean distance in meters.
+        
+        Takes arrays and broadcasts, so whole batches of pairs are computed
+        in one call rather than paying NumPy's dispatch cost per pair.
+        cos_lat, if given, replaces the cosine of each pair's mid-latitude;
+        pass cos(lat1) to take one cosine per origin instead of one per pair.
+        """
         # Simple approximation for India latitudes
-        lat_m = (lat2 - lat1) * 111000
-        lng_m = (lng2 - lng1) * 111000 * np.cos(np.radians((lat1 + lat2) / 2))
-        return np.sqrt(lat_m**2 + lng_m**2)
+        if cos_lat is None:
+            cos_lat = np.cos(np.radians((lat1 + lat2) * 0.5))
+        lat_m = (lat2 - lat1) * 111000.0
+        lng_m = (lng2 - lng1) * (111000.0 * cos_lat)
+        return np.hypot(lat_m, lng_m)
     
-    def _calculate_area_km2(self, polygon) -> float:
-        """Calculate area in km² (rough approximation)."""
-        if polygon is None or polygon.is_empty:
-            return 0.0
-        try:
-            # At ~22°N (Gujarat), 1 degree ≈ 111km lat, 103km lng
-            return polygon.area * 111 * 103
-        except:
-            return 0.0
+    def _calculate_areas_km2(self, polygons: List[Polygon]) -> np.ndarray:
+        """
+        Areas in km² of WGS84 polygons, measured in an equal-area projection.
+        All polygons are projected in one batched pyproj call.
+        """
+        geoms = np.array(polygons, dtype=object)
+        to_equal_area = _equal_area_transformer()
+        projected = shapely.transform(
+            geoms, lambda xy: np.column_stack(to_equal_area.transform(xy[:, 0], xy[:, 1]))
+        )
+        areas = shapely.area(projected) / 1e6
+        return np.nan_to_num(areas, nan=0.0)
     
     def _polygon_to_geojson(self, polygon) -> Dict:
         """Convert Shapely polygon to GeoJSON geometry."""
@@ -444,6 +981,12 @@ class WeightedVoronoiEngine:
         return {"type": "Polygon", "coordinates": []}
 
 
+@functools.lru_cache(maxsize=None)
+def _equal_area_transformer() -> pyproj.Transformer:
+    """WGS84 -> World Cylindrical Equal Area, built on first use rather than at import."""
+    return pyproj.Transformer.from_crs("EPSG:4326", "EPSG:6933", always_xy=True)
+
+
 def get_weighted_voronoi_engine() -> WeightedVoronoiEngine:
     """Get a new instance of the weighted Voronoi engine."""
     return WeightedVoronoiEngine()
@@ -0,0 +1,63 @@
+"""
+Shared fixtures for the API tests
+"""
+import importlib.util
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+
+def pytest_configure(config):
+    # Registered here too so the marker is known when pytest-xdist isn't installed
+    config.addinivalue_line(
+        "markers", "xdist_group(name): run these tests on the same xdist worker"
+    )
+    config.addinivalue_line(
+        "markers", "slow: loads boundary data or clips against it; deselect with -m \"not slow\""
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Fail collection if a test name is defined twice, e.g. by a copied test module"""
+    seen = {}
+    for item in items:
+        key = (item.cls.__name__ if item.cls else None, item.originalname)
+        if key in seen and seen[key] != item.path:
+            raise pytest.UsageError(
+                f"{item.originalname} is defined in both {seen[key].name} and {item.path.name}"
+            )
+        seen[key] = item.path
+
+
+@pytest.fixture(scope="session")
+def preload_boundaries():
+    """Parse the boundary files once per worker, before the first Voronoi test"""
+    from app.routers import boundaries
+    from app.services.voronoi_engine import VoronoiEngine
+    
+    VoronoiEngine()
+    boundaries._load_india_boundary()
+    boundaries._load_states_gdf()
+
+
+@pytest.fixture(scope="session")
+def app(preload_boundaries):
+    """
+    The FastAPI app, imported on first use so workers that only run the
+    service unit tests never build it.
+    """
+    from app.main import app as fastapi_app
+    return fastapi_app
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    # uvloop comes with uvicorn[standard] everywhere except Windows
+    return "asyncio", {"use_uvloop": importlib.util.find_spec("uvloop") is not None}
+
+
+@pytest.fixture(scope="session")
+async def client(app, anyio_backend):
+    """One in-process client for the whole session instead of a portal per request"""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        yield c
@@ -1,38 +1,38 @@
 """
 Unit tests for the Voronoi Population Mapping API
 """
+from io import BytesIO
+
 import pytest
-from fastapi.testclient import TestClient
-from app.main import app
 
-client = TestClient(app)
+pytestmark = pytest.mark.anyio
 
 
 class TestHealthEndpoints:
     """Test health check endpoints"""
     
-    def test_root_health_check(self):
+    async def test_root_health_check(self, client):
         """Test root endpoint returns OK"""
-        response = client.get("/")
+        response = await client.get("/")
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "ok"
         assert "message" in data
 
-    def test_health_endpoint(self):
+    async def test_health_endpoint(self, client):
         """Test /health endpoint"""
-        response = client.get("/health")
+        response = await client.get("/health")
         assert response.status_code == 200
-        data = response.json()
-        assert data["status"] == "healthy"
+        assert response.json() == {"status": "healthy", "api_version": "0.2.0"}
 
 
+@pytest.mark.xdist_group(name="voronoi")
 class TestVoronoiEndpoints:
     """Test Voronoi computation endpoints"""
     
-    def test_sample_voronoi(self):
+    async def test_sample_voronoi(self, client):
         """Test sample Voronoi returns valid GeoJSON"""
-        response = client.get("/api/voronoi/sample")
+        response = await client.get("/api/voronoi/sample")
         assert response.status_code == 200
         data = response.json()
         assert data["type"] == "FeatureCollection"
@@ -40,9 +40,9 @@ class TestVoronoiEndpoints:
         # Sample has 6 cities, should have features
         assert len(data["features"]) > 0
     
-    def test_compute_voronoi_with_4_facilities(self):
-        """Test Voronoi computation with 4 facilities"""
-        payload = {
+    @pytest.mark.parametrize("payload,expected_status", [
+        # 4 facilities, unclipped
+        ({
             "facilities": [
                 {"name": "Delhi", "lat": 28.6139, "lng": 77.2090},
                 {"name": "Mumbai", "lat": 19.0760, "lng": 72.8777},
@@ -50,28 +50,49 @@ class TestVoronoiEndpoints:
                 {"name": "Kolkata", "lat": 22.5726, "lng": 88.3639},
             ],
             "clip_to_india": False
-        }
-        response = client.post("/api/voronoi/compute", json=payload)
-        assert response.status_code == 200
-        data = response.json()
-        assert data["type"] == "FeatureCollection"
-        assert "features" in data
-    
-    def test_compute_voronoi_too_few_facilities(self):
-        """Test Voronoi with less than 3 facilities returns error"""
-        payload = {
+        }, 200),
+        # Less than 3 facilities is an error
+        ({
             "facilities": [
                 {"name": "Delhi", "lat": 28.6139, "lng": 77.2090},
                 {"name": "Mumbai", "lat": 19.0760, "lng": 72.8777},
             ],
             "clip_to_india": False
-        }
-        response = client.post("/api/voronoi/compute", json=payload)
-        assert response.status_code == 400
+        }, 400),
+        # Clipped to a specific state
+        pytest.param({
+            "facilities": [
+                {"name": "Delhi", "lat": 28.6139, "lng": 77.2090},
+                {"name": "Noida", "lat": 28.5355, "lng": 77.3910},
+                {"name": "Gurgaon", "lat": 28.4595, "lng": 77.0266},
+                {"name": "Faridabad", "lat": 28.4089, "lng": 77.3178},
+            ],
+            "clip_to_india": True,
+            "state_filter": "NCT of Delhi"
+        }, 200, marks=pytest.mark.slow),
+        # No state filter clips to all of India
+        pytest.param({
+            "facilities": [
+                {"name": "Delhi", "lat": 28.6139, "lng": 77.2090},
+                {"name": "Mumbai", "lat": 19.0760, "lng": 72.8777},
+                {"name": "Chennai", "lat": 13.0827, "lng": 80.2707},
+            ],
+            "clip_to_india": True,
+            "state_filter": None
+        }, 200, marks=pytest.mark.slow),
+    ], ids=["4_facilities", "too_few_facilities", "state_filter", "all_india"])
+    async def test_compute_voronoi(self, client, payload, expected_status):
+        """Test Voronoi computation for several facility sets"""
+        response = await client.post("/api/voronoi/compute", json=payload)
+        assert response.status_code == expected_status
+        if expected_status == 200:
+            data = response.json()
+            assert data["type"] == "FeatureCollection"
+            assert "features" in data
     
-    def test_voronoi_feature_properties(self):
+    async def test_voronoi_feature_properties(self, client):
         """Test that Voronoi features have expected properties"""
-        response = client.get("/api/voronoi/sample")
+        response = await client.get("/api/voronoi/sample")
         data = response.json()
         
         if len(data["features"]) > 0:
@@ -84,28 +105,42 @@ class TestVoronoiEndpoints:
             assert "name" in props
             assert "area_sq_km" in props
             assert props["area_sq_km"] > 0
+    
+    async def test_sample_voronoi_gets_a_fresh_dcel(self, client):
+        """Test that each sample request gets its own DCEL"""
+        from app.services.dcel import get_current_dcel
+        
+        await client.get("/api/voronoi/sample")
+        first = get_current_dcel()
+        first.faces.clear()
+        await client.get("/api/voronoi/sample")
+        second = get_current_dcel()
+        
+        assert second is not first
+        assert len(second.faces) > 0
 
 
 class TestBoundariesEndpoints:
     """Test boundaries endpoints"""
     
-    def test_india_boundary(self):
+    async def test_india_boundary(self, client):
         """Test India boundary returns valid GeoJSON"""
-        response = client.get("/api/boundaries/india")
+        response = await client.get("/api/boundaries/india")
         assert response.status_code == 200
         data = response.json()
         assert data["type"] == "Feature"
         assert data["properties"]["name"] == "India"
         assert data["geometry"]["type"] in ["Polygon", "MultiPolygon"]
     
-    def test_invalid_boundary_level(self):
+    async def test_invalid_boundary_level(self, client):
         """Test invalid boundary level returns error"""
-        response = client.get("/api/boundaries/invalid")
+        response = await client.get("/api/boundaries/invalid")
         assert response.status_code == 400
     
-    def test_states_list(self):
+    @pytest.mark.slow
+    async def test_states_list(self, client):
         """Test that states list endpoint returns state names"""
-        response = client.get("/api/boundaries/states/list")
+        response = await client.get("/api/boundaries/states/list")
         assert response.status_code == 200
         data = response.json()
         assert isinstance(data, list)
@@ -114,96 +149,60 @@ class TestBoundariesEndpoints:
         # Check some known states exist
         assert any("Delhi" in s for s in data)
     
-    def test_get_state_boundary(self):
+    async def test_get_state_boundary(self, client):
         """Test getting boundary for a specific state"""
-        response = client.get("/api/boundaries/states/NCT%20of%20Delhi")
+        response = await client.get("/api/boundaries/states/NCT%20of%20Delhi")
         assert response.status_code == 200
         data = response.json()
         assert data["type"] == "Feature"
         assert "geometry" in data
         assert "properties" in data
     
-    def test_get_state_boundary_not_found(self):
+    async def test_get_state_boundary_not_found(self, client):
         """Test getting boundary for non-existent state"""
-        response = client.get("/api/boundaries/states/NonExistentState")
+        response = await client.get("/api/boundaries/states/NonExistentState")
         assert response.status_code == 404
 
 
-class TestStateFilteredVoronoi:
-    """Test Voronoi computation with state filtering"""
-    
-    def test_compute_voronoi_with_state_filter(self):
-        """Test Voronoi clipped to a specific state"""
-        payload = {
-            "facilities": [
-                {"name": "Delhi", "lat": 28.6139, "lng": 77.2090},
-                {"name": "Noida", "lat": 28.5355, "lng": 77.3910},
-                {"name": "Gurgaon", "lat": 28.4595, "lng": 77.0266},
-                {"name": "Faridabad", "lat": 28.4089, "lng": 77.3178},
-            ],
-            "clip_to_india": True,
-            "state_filter": "NCT of Delhi"
-        }
-        response = client.post("/api/voronoi/compute", json=payload)
-        assert response.status_code == 200
-        data = response.json()
-        assert data["type"] == "FeatureCollection"
-        assert "features" in data
-    
-    def test_compute_voronoi_all_india(self):
-        """Test Voronoi without state filter uses all India"""
-        payload = {
-            "facilities": [
-                {"name": "Delhi", "lat": 28.6139, "lng": 77.2090},
-                {"name": "Mumbai", "lat": 19.0760, "lng": 72.8777},
-                {"name": "Chennai", "lat": 13.0827, "lng": 80.2707},
-            ],
-            "clip_to_india": True,
-            "state_filter": None
-        }
-        response = client.post("/api/voronoi/compute", json=payload)
-        assert response.status_code == 200
-        data = response.json()
-        assert data["type"] == "FeatureCollection"
+_INVALID_UPLOAD = ("test.txt", b"some,data\n1,2", "text/plain")
+_VALID_UPLOAD = (
+    "test.csv",
+    b"name,latitude,longitude,type\nTest Hospital,28.6139,77.2090,hospital\nTest Clinic,19.0760,72.8777,clinic",
+    "text/csv",
+)
 
 
 class TestUploadEndpoints:
     """Test CSV upload endpoints"""
     
-    def test_upload_requires_csv_file(self):
-        """Test that non-CSV files are rejected"""
-        from io import BytesIO
-        
-        # Create a fake text file
-        file_content = b"some,data\n1,2"
-        files = {"file": ("test.txt", BytesIO(file_content), "text/plain")}
-        
-        response = client.post("/api/upload/csv", files=files)
-        assert response.status_code == 400
-    
-    def test_upload_valid_csv(self):
-        """Test uploading a valid CSV file"""
-        from io import BytesIO
-        
-        csv_content = b"name,latitude,longitude,type\nTest Hospital,28.6139,77.2090,hospital\nTest Clinic,19.0760,72.8777,clinic"
-        files = {"file": ("test.csv", BytesIO(csv_content), "text/csv")}
+    @pytest.mark.parametrize("upload,expected_status,expected_facilities", [
+        (_INVALID_UPLOAD, 400, None),  # non-CSV files are rejected
+        (_VALID_UPLOAD, 200, 2),
+    ])
+    async def test_upload_csv(self, client, upload, expected_status, expected_facilities):
+        """Test uploading CSV and non-CSV files"""
+        filename, content, content_type = upload
+        # httpx consumes the stream, so each request gets a fresh buffer
+        files = {"file": (filename, BytesIO(content), content_type)}
         
-        response = client.post("/api/upload/csv", files=files)
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] == True
-        assert data["valid_facilities"] == 2
-        assert len(data["facilities"]) == 2
+        response = await client.post("/api/upload/csv", files=files)
+        assert response.status_code == expected_status
+        if expected_facilities is not None:
+            data = response.json()
+            assert data["success"] == True
+            assert data["valid_facilities"] == expected_facilities
+            assert len(data["facilities"]) == expected_facilities
 
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 
 
+@pytest.mark.xdist_group(name="voronoi")
 class TestAnalyticsEndpoints:
     """Test analytics and facility management endpoints"""
     
-    def test_insights_returns_coverage_stats(self):
+    async def test_insights_returns_coverage_stats(self, client):
         """Test that insights endpoint returns coverage statistics"""
         payload = {
             "facilities": [
@@ -215,14 +214,14 @@ class TestAnalyticsEndpoints:
             "clip_to_india": True,
             "include_population": True
         }
-        response = client.post("/api/voronoi/insights", json=payload)
+        response = await client.post("/api/voronoi/insights", json=payload)
         assert response.status_code == 200
         data = response.json()
         assert "coverage_stats" in data
         assert "most_overburdened" in data
         assert "most_underserved" in data
     
-    def test_insights_returns_enclosing_circles(self):
+    async def test_insights_returns_enclosing_circles(self, client):
         """Test that insights returns enclosing circle data"""
         payload = {
             "facilities": [
@@ -232,13 +231,13 @@ class TestAnalyticsEndpoints:
             ],
             "clip_to_india": True
         }
-        response = client.post("/api/voronoi/insights", json=payload)
+        response = await client.post("/api/voronoi/insights", json=payload)
         assert response.status_code == 200
         data = response.json()
         assert "minimum_enclosing_circle" in data
         assert "largest_empty_circle" in data
     
-    def test_find_nearest_facility(self):
+    async def test_find_nearest_facility(self, client):
         """Test finding nearest facility to a click location"""
         payload = {
             "click_lat": 20.0,
@@ -249,7 +248,7 @@ class TestAnalyticsEndpoints:
                 {"name": "Chennai", "lat": 13.0827, "lng": 80.2707},
             ]
         }
-        response = client.post("/api/voronoi/find-nearest", json=payload)
+        response = await client.post("/api/voronoi/find-nearest", json=payload)
         assert response.status_code == 200
         data = response.json()
         assert "index" in data
@@ -257,12 +256,12 @@ class TestAnalyticsEndpoints:
         # Mumbai should be nearest to (20, 75)
         assert data["facility"]["name"] == "Mumbai"
     
-    def test_find_nearest_empty_facilities(self):
+    async def test_find_nearest_empty_facilities(self, client):
         """Test find_nearest with empty facilities list"""
         payload = {
             "click_lat": 20.0,
             "click_lng": 75.0,
             "facilities": []
         }
-        response = client.post("/api/voronoi/find-nearest", json=payload)
+        response = await client.post("/api/voronoi/find-nearest", json=payload)
         assert response.status_code == 400
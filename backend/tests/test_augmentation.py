@@ -3,14 +3,16 @@ from pathlib import Path
 import pandas as pd
 from app.services.augmentation_service import AugmentationService
 
-@pytest.fixture
-def sample_raw_csv(tmp_path):
-    csv_content = """lat_coord,lng_coord,location_title,category
+RAW_CSV = """lat_coord,lng_coord,location_title,category
 23.0225,72.5714,"Hospital A","Health"
 21.1702,72.8311,"Hospital B","Health"
 """
-    file_path = tmp_path / "raw_data.csv"
-    file_path.write_text(csv_content)
+
+@pytest.fixture(scope="module")
+def sample_raw_csv(tmp_path_factory):
+    # Written once per module; tests that let the service delete it use their own copy
+    file_path = tmp_path_factory.mktemp("augmentation") / "raw_data.csv"
+    file_path.write_text(RAW_CSV)
     return file_path
 
 def test_analyze_csv(sample_raw_csv):
@@ -25,7 +27,10 @@ def test_analyze_csv(sample_raw_csv):
     assert "name" in result["suggested_mapping"]
     assert result["suggested_mapping"]["lat"] == "lat_coord"
 
-def test_transform_csv(sample_raw_csv, tmp_path):
+def test_transform_csv(tmp_path):
+    # transform_csv deletes its input file
+    sample_raw_csv = tmp_path / "raw_data.csv"
+    sample_raw_csv.write_text(RAW_CSV)
     service = AugmentationService()
     mapping = {
         "name": "location_title",
@@ -34,11 +39,31 @@ def test_transform_csv(sample_raw_csv, tmp_path):
         "type": "category"
     }
     
-    output_name = "standardized.csv"
-    output_path = service.transform_csv(sample_raw_csv, mapping, output_name)
+    facilities = service.transform_csv(sample_raw_csv, mapping)
     
-    assert output_path.exists()
-    df = pd.read_csv(output_path)
-    assert set(df.columns) == {"name", "lat", "lng", "type"}
-    assert df.iloc[0]["name"] == "Hospital A"
-    assert df.iloc[0]["lat"] == 23.0225
+    assert not sample_raw_csv.exists()
+    assert len(facilities) == 2
+    assert {"name", "lat", "lng", "type"} <= set(facilities[0])
+    assert facilities[0]["name"] == "Hospital A"
+    assert facilities[0]["lat"] == 23.0225
+    assert facilities[0]["type"] == "Health"
+
+def test_transform_csv_keeps_text_as_written(tmp_path):
+    raw = tmp_path / "raw_data.csv"
+    # Every name looks numeric
+    raw.write_text("name,lat,lng,type\n001,28.50,77.20,Clinic\n1.50,19.07,72.87,Clinic\n")
+    mapping = {"name": "name", "lat": "lat", "lng": "lng", "type": "type"}
+
+    facilities = AugmentationService.transform_csv(raw, mapping)
+
+    assert [f["name"] for f in facilities] == ["001", "1.50"]
+
+def test_transform_csv_quoted_newline_in_header(tmp_path):
+    raw = tmp_path / "raw_data.csv"
+    raw.write_text('name,lat,lng,"facility\ntype"\nWard 7,28.50,77.20,Clinic\n')
+    mapping = {"name": "name", "lat": "lat", "lng": "lng", "type": "facility\ntype"}
+
+    facilities = AugmentationService.transform_csv(raw, mapping)
+
+    assert facilities[0]["name"] == "Ward 7"
+    assert facilities[0]["type"] == "Clinic"
@@ -0,0 +1,43 @@
+"""
+Tests for the chat endpoints, run in-process with the LLM call mocked out
+"""
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_chat_message(client, monkeypatch):
+    calls = []
+    
+    async def fake_process_chat_message(session_id, message, api_key, provider="openai"):
+        calls.append((session_id, message, api_key, provider))
+        return {
+            "response": "Facility A has the largest area",
+            "data": None,
+            "tools_used": ["get_facilities_by_area"],
+        }
+    
+    monkeypatch.setattr("app.routers.chat.process_chat_message", fake_process_chat_message)
+    
+    response = await client.post("/api/chat/message", json={
+        "session_id": "test-session",
+        "message": "Which facility has the largest area?",
+        "api_key": "test-key",
+    })
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["response"] == "Facility A has the largest area"
+    assert data["session_id"] == "test-session"
+    assert data["tools_used"] == ["get_facilities_by_area"]
+    assert data["tool_calls"] == []
+    assert calls == [("test-session", "Which facility has the largest area?", "test-key", "openai")]
+
+
+async def test_chat_message_requires_api_key(client):
+    response = await client.post("/api/chat/message", json={
+        "session_id": "test-session",
+        "message": "Hello",
+        "api_key": "",
+    })
+    assert response.status_code == 400
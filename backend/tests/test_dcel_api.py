@@ -1,9 +1,7 @@
-from fastapi.testclient import TestClient
-from app.main import app
 from app.services.dcel import set_current_dcel, DCEL
 import pytest
 
-client = TestClient(app)
+pytestmark = pytest.mark.anyio
 
 # Mock DCEL with some dummy data for testing
 @pytest.fixture
@@ -17,25 +15,20 @@ def mock_dcel():
     # or populate a real DCEL with minimal data
     return dcel
 
-def test_health_check():
-    response = client.get("/health")
-    assert response.status_code == 200
-    assert response.json() == {"status": "healthy", "api_version": "0.2.0"}
-
-def test_dcel_endpoints_no_data():
+async def test_dcel_endpoints_no_data(client):
     # Ensure we start with no DCEL
     set_current_dcel(None)
     
     # Test top-by-population without computed Voronoi
-    response = client.post("/api/dcel/top-by-population", json={"top_n": 5})
+    response = await client.post("/api/dcel/top-by-population", json={"top_n": 5})
     assert response.status_code == 400
     assert "No Voronoi diagram has been computed yet" in response.json()["detail"]
 
     # Test point query without computed Voronoi
-    response = client.post("/api/dcel/query-point", json={"lat": 10.0, "lng": 20.0})
+    response = await client.post("/api/dcel/query-point", json={"lat": 10.0, "lng": 20.0})
     assert response.status_code == 400
 
-def test_top_facilities_type_coercion():
+async def test_top_facilities_type_coercion(client):
     # This tests the Pydantic model validation specifically, enabling it even without DCEL
     # We want to verify that passing a float doesn't cause a validation error (422)
     # but proceeds to the logic (which returns 400 because no DCEL)
@@ -45,7 +38,7 @@ def test_top_facilities_type_coercion():
     # Pass float 5.0 - should be coerced to 5 by Pydantic
     # If coercion fails, we'd get 422 Unprocessable Entity
     # If coercion works, we get 400 Bad Request (business logic error)
-    response = client.post("/api/dcel/top-by-population", json={"top_n": 5.0})
+    response = await client.post("/api/dcel/top-by-population", json={"top_n": 5.0})
     
     assert response.status_code == 400  # Business logic error, meaning validation passed
     assert response.status_code != 422  # Validation error
@@ -1,114 +1,116 @@
-from fastapi.testclient import TestClient
-from unittest.mock import MagicMock, patch
-from app.main import app
+from dataclasses import dataclass, field
 from app.services.dcel import set_current_dcel
 import pytest
 
-client = TestClient(app)
+pytestmark = pytest.mark.anyio
 
-# Helper to create a mock VoronoiFace
-def create_mock_face(facility_id="F1", facility_name="Hospital A", population=1000, area=5.0):
-    face = MagicMock()
-    face.facility_id = facility_id
-    face.facility_name = facility_name
-    face.properties = {"population": population, "area_sq_km": area}
-    return face
+@dataclass(frozen=True)
+class StubFace:
+    facility_id: str
+    facility_name: str
+    properties: dict
 
-@pytest.fixture
+# Helper to create a stub VoronoiFace
+def create_stub_face(facility_id="F1", facility_name="Hospital A", population=1000, area=5.0):
+    return StubFace(facility_id, facility_name, {"population": population, "area_sq_km": area})
+
+@dataclass
+class StubDCEL:
+    """Just the DCEL methods the endpoints call, returning canned data"""
+    unknown_ids: set = field(default_factory=lambda: {"missing"})
+    last_point_query: tuple = None
+    last_top_n_call: tuple = None
+    
+    def point_query(self, lat, lng):
+        self.last_point_query = (lat, lng)
+        return create_stub_face()
+    
+    def range_query(self, min_lat, min_lng, max_lat, max_lng):
+        return [
+            create_stub_face("F1", "Hospital A", 1000, 5.0),
+            create_stub_face("F2", "Clinic B", 500, 2.0)
+        ]
+    
+    def get_facilities_by_population(self, top_n=None, state=None):
+        self.last_top_n_call = (top_n, state)
+        return [
+            {"facility_id": "F1", "facility_name": "Hospital A", "population": 1000},
+            {"facility_id": "F2", "facility_name": "Clinic B", "population": 500}
+        ]
+    
+    def get_face_by_facility_id(self, fid):
+        if fid in self.unknown_ids:
+            return None
+        return create_stub_face(fid, f"Facility {fid}")
+    
+    def get_adjacent_facilities(self, fid):
+        return ["F2", "F3"]
+    
+    def to_dict(self):
+        return {
+            "num_sites": 10,
+            "num_vertices": 20,
+            "num_faces": 10,
+            "num_half_edges": 30,
+            "bounds": [0, 0, 100, 100]
+        }
+
+@pytest.fixture(scope="module")
 def mock_dcel_computed():
-    dcel = MagicMock()
-    
-    # Mock point_query
-    dcel.point_query.return_value = create_mock_face()
-    
-    # Mock range_query
-    dcel.range_query.return_value = [
-        create_mock_face("F1", "Hospital A", 1000, 5.0),
-        create_mock_face("F2", "Clinic B", 500, 2.0)
-    ]
-    
-    # Mock get_facilities_by_population
-    dcel.get_facilities_by_population.return_value = [
-        {"facility_id": "F1", "facility_name": "Hospital A", "population": 1000},
-        {"facility_id": "F2", "facility_name": "Clinic B", "population": 500}
-    ]
-    
-    # Mock get_face_by_facility_id
-    dcel.get_face_by_facility_id.side_effect = lambda fid: create_mock_face(fid, f"Facility {fid}")
-    
-    # Mock get_adjacent_facilities
-    dcel.get_adjacent_facilities.return_value = ["F2", "F3"]
-    
-    # Mock to_dict for summary
-    dcel.to_dict.return_value = {
-        "num_sites": 10,
-        "num_vertices": 20,
-        "num_faces": 10,
-        "num_half_edges": 30,
-        "bounds": [0, 0, 100, 100]
-    }
-    
-    return dcel
+    return StubDCEL()
 
-def test_query_point_success(mock_dcel_computed):
+@pytest.fixture(scope="module", autouse=True)
+def current_dcel(mock_dcel_computed):
     set_current_dcel(mock_dcel_computed)
-    
-    response = client.post("/api/dcel/query-point", json={"lat": 10.0, "lng": 20.0})
-    
-    assert response.status_code == 200
-    data = response.json()
-    assert data["found"] is True
-    assert data["facility_id"] == "F1"
-    assert data["facility_name"] == "Hospital A"
-    assert data["population"] == 1000
-    
-    # Verify mock was called correctly
-    mock_dcel_computed.point_query.assert_called_with(10.0, 20.0)
+    yield
+    set_current_dcel(None)
 
-def test_range_query_success(mock_dcel_computed):
-    set_current_dcel(mock_dcel_computed)
-    
-    response = client.post("/api/dcel/range-query", json={
-        "min_lat": 0, "min_lng": 0, "max_lat": 10, "max_lng": 10
-    })
+async def test_batch_success(client, mock_dcel_computed):
+    # Test with float top_n (Gemini style)
+    response = await client.post("/api/dcel/batch", json={"ops": [
+        {"op": "query_point", "args": {"lat": 10.0, "lng": 20.0}},
+        {"op": "range_query", "args": {"min_lat": 0, "min_lng": 0, "max_lat": 10, "max_lng": 10}},
+        {"op": "top_by_population", "args": {"top_n": 5.0}},
+        {"op": "adjacent", "args": {"facility_id": "F1"}},
+        {"op": "summary"},
+    ]})
     
     assert response.status_code == 200
     data = response.json()
-    assert data["count"] == 2
-    assert len(data["facilities"]) == 2
-    assert data["facilities"][0]["facility_id"] == "F1"
-
-def test_top_facilities_success(mock_dcel_computed):
-    set_current_dcel(mock_dcel_computed)
+    assert data["count"] == 5
+    assert all(r["status_code"] == 200 for r in data["results"])
+    point, box, top, adjacent, summary = (r["data"] for r in data["results"])
     
-    # Test with float top_n (Gemini style)
-    response = client.post("/api/dcel/top-by-population", json={"top_n": 5.0})
+    assert point["found"] is True
+    assert point["facility_id"] == "F1"
+    assert point["facility_name"] == "Hospital A"
+    assert point["population"] == 1000
     
-    assert response.status_code == 200
-    data = response.json()
-    assert data["count"] == 2
-    assert data["facilities"][0]["population"] == 1000
+    assert box["count"] == 2
+    assert len(box["facilities"]) == 2
+    assert box["facilities"][0]["facility_id"] == "F1"
     
-    # Verify mock called with INT 5, not float 5.0
-    mock_dcel_computed.get_facilities_by_population.assert_called_with(top_n=5, state=None)
-
-def test_adjacent_facilities_success(mock_dcel_computed):
-    set_current_dcel(mock_dcel_computed)
+    assert top["count"] == 2
+    assert top["facilities"][0]["population"] == 1000
     
-    response = client.get("/api/dcel/adjacent/F1")
+    assert adjacent["facility_id"] == "F1"
+    assert adjacent["adjacent_count"] == 2
+    assert adjacent["adjacent_facilities"][0]["facility_id"] == "F2"
     
-    assert response.status_code == 200
-    data = response.json()
-    assert data["facility_id"] == "F1"
-    assert data["adjacent_count"] == 2
-    assert data["adjacent_facilities"][0]["facility_id"] == "F2"
-
-def test_dcel_summary_success(mock_dcel_computed):
-    set_current_dcel(mock_dcel_computed)
+    assert summary["available"] is True
+    assert summary["data"]["num_sites"] == 10
     
-    response = client.get("/api/dcel/summary")
+    # Verify the stub was called correctly, with INT 5 rather than float 5.0
+    assert mock_dcel_computed.last_point_query == (10.0, 20.0)
+    assert mock_dcel_computed.last_top_n_call == (5, None)
+    assert type(mock_dcel_computed.last_top_n_call[0]) is int
+
+async def test_batch_reports_errors_per_operation(client):
+    response = await client.post("/api/dcel/batch", json={"ops": [
+        {"op": "adjacent", "args": {"facility_id": "missing"}},
+        {"op": "query_point", "args": {"lat": 100.0, "lng": 20.0}},
+        {"op": "summary"},
+    ]})
     
     assert response.status_code == 200
-    data = response.json()
-    assert data["available"] is True
-    assert data["data"]["num_sites"] == 10
+    assert [r["status_code"] for r in response.json()["results"]] == [404, 422, 200]
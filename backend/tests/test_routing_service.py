@@ -0,0 +1,117 @@
+import httpx
+import pytest
+from app.services.routing_service import RoadDistanceCache, RouteResult, RoutingService
+
+
+def make_service(handler):
+    service = RoutingService()
+    service._sync_client = httpx.Client(transport=httpx.MockTransport(handler))
+    return service
+
+
+def test_route_distance_ok():
+    def handler(request):
+        return httpx.Response(200, json={
+            "code": "Ok",
+            "routes": [{"distance": 12000, "duration": 600}]
+        })
+
+    result = make_service(handler).get_route_distance_sync(28.6, 77.2, 28.7, 77.3)
+
+    assert result.connected is True
+    assert result.distance_km == 12.0
+    assert result.duration_min == 10.0
+
+
+def test_route_distance_http_error_status():
+    service = make_service(lambda request: httpx.Response(503))
+
+    result = service.get_route_distance_sync(28.6, 77.2, 28.7, 77.3)
+
+    assert result.connected is False
+    assert result.error == "HTTP 503"
+
+
+def test_batch_distance_transport_error():
+    def handler(request):
+        raise httpx.ConnectError("connection refused")
+
+    results = make_service(handler).batch_distance_sync(28.6, 77.2, [(28.7, 77.3), (28.8, 77.4)])
+
+    assert len(results) == 2
+    assert all(not r.connected for r in results)
+    assert results[0].error == "connection refused"
+
+
+def test_batch_distance_reuses_cache_for_nearby_points():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        n = request.url.path.count(";") + 1
+        return httpx.Response(200, json={
+            "code": "Ok",
+            "distances": [[0.0] + [5000.0] * (n - 1)],
+            "durations": [[0.0] + [300.0] * (n - 1)]
+        })
+
+    service = make_service(handler)
+    first = service.batch_distance_sync(28.6, 77.2, [(28.7, 77.3)])
+    # Within the ~10 m cache grid of the first query
+    second = service.batch_distance_sync(28.600001, 77.2, [(28.7, 77.300002), (28.9, 77.5)])
+
+    assert len(calls) == 2
+    assert calls[1].count(";") == 1  # only the uncached destination was fetched
+    assert first[0].distance_km == second[0].distance_km == 5.0
+    assert second[0].destination == (28.7, 77.300002)
+    assert second[1].connected is True
+
+
+def test_batch_matrix_single_table_request():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json={
+            "code": "Ok",
+            "distances": [[1000.0, 2000.0, None], [3000.0, 4000.0, 5000.0]],
+            "durations": [[60.0, 120.0, None], [180.0, 240.0, 300.0]]
+        })
+
+    service = make_service(handler)
+    distances, durations = service.batch_matrix_sync(
+        [(28.6, 77.2), (19.0, 72.8)],
+        [(13.0, 80.2), (22.5, 88.3), (12.9, 77.5)]
+    )
+
+    assert len(calls) == 1
+    assert calls[0].url.params["sources"] == "0;1"
+    assert calls[0].url.params["destinations"] == "2;3;4"
+    assert distances.shape == (2, 3)
+    assert distances[1, 2] == 5.0
+    assert durations[0, 1] == 2.0
+    assert distances[0, 2] == float("inf")
+
+
+def test_road_distance_cache_persists_connected_results(tmp_path):
+    path = str(tmp_path / "routes.sqlite")
+    cache = RoadDistanceCache(path)
+    cache.put_many(1, [
+        RouteResult((28.6, 77.2), (28.7, 77.3), 12.0, 10.0, True),
+        RouteResult((28.6, 77.2), (28.8, 77.4), float("inf"), float("inf"), False),
+    ])
+    cache.close()
+
+    reopened = RoadDistanceCache(path)
+    hit, miss = reopened.get_many(1, (28.6, 77.2), [(28.700001, 77.3), (28.8, 77.4)])
+
+    assert hit.distance_km == 12.0
+    assert hit.destination == (28.700001, 77.3)
+    assert miss is None
+    assert reopened.get_many(2, (28.6, 77.2), [(28.7, 77.3)]) == [None]
+
+
+def test_road_distance_cache_defaults_outside_source_tree(tmp_path, monkeypatch):
+    monkeypatch.setenv("TESSERA_CACHE_DIR", str(tmp_path))
+
+    assert RoadDistanceCache().path == str(tmp_path / "routing" / "road_distances.sqlite")
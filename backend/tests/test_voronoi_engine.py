@@ -0,0 +1,109 @@
+"""
+Unit tests for the Voronoi engine
+"""
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import shapely
+from scipy.spatial import Voronoi
+
+from app.services import voronoi_engine
+from app.services.voronoi_engine import QHULL_OPTIONS, VoronoiEngine
+
+COORDS = [(77.2090, 28.6139), (72.8777, 19.0760), (80.2707, 13.0827), (88.3639, 22.5726)]
+NAMES = ["Delhi", "Mumbai", "Chennai", "Kolkata"]
+IDS = ["1", "2", "3", "4"]
+
+
+def test_repeated_compute_is_served_from_cache():
+    engine = VoronoiEngine()
+    VoronoiEngine._cells_cache.clear()
+
+    first = engine.compute_voronoi(COORDS, NAMES, IDS, clip_to_india=False)
+    with patch.object(VoronoiEngine, "_build_cells") as build:
+        second = engine.compute_voronoi(COORDS, NAMES, IDS, clip_to_india=False)
+
+    build.assert_not_called()
+    assert second == first
+    # Each call gets its own GeoJSON, so callers can't corrupt the cache
+    assert second["features"][0] is not first["features"][0]
+
+
+def test_cache_key_depends_on_inputs():
+    engine = VoronoiEngine()
+    VoronoiEngine._cells_cache.clear()
+
+    engine.compute_voronoi(COORDS, NAMES, IDS, clip_to_india=False)
+    moved = [(77.3, 28.6)] + COORDS[1:]
+    result = engine.compute_voronoi(moved, NAMES, IDS, clip_to_india=False)
+
+    assert len(VoronoiEngine._cells_cache) == 2
+    assert result["features"][0]["properties"]["centroid_lng"] == 77.3
+
+
+@pytest.mark.parametrize("error", [
+    shapely.errors.UnsupportedGEOSVersionError("GEOS 3.12 required"),
+    TypeError("voronoi_polygons() got an unexpected keyword argument 'ordered'"),
+])
+def test_geos_path_falls_back_to_scipy(error):
+    engine = VoronoiEngine()
+    VoronoiEngine._cells_cache.clear()
+    expected = engine.compute_voronoi(COORDS, NAMES, IDS, clip_to_india=False)
+    VoronoiEngine._cells_cache.clear()
+
+    with patch.object(voronoi_engine, "GEOS_VORONOI_MIN_POINTS", 0), \
+            patch.object(shapely, "voronoi_polygons", side_effect=error) as geos:
+        result = engine.compute_voronoi(COORDS, NAMES, IDS, clip_to_india=False)
+
+    geos.assert_called_once()
+    assert result == expected
+
+
+def test_geos_path_skipped_on_old_geos():
+    engine = VoronoiEngine()
+    points = np.column_stack(engine.to_projected.transform(*zip(*COORDS)))
+
+    with patch.object(shapely, "geos_version", (3, 11, 2)), \
+            patch.object(shapely, "voronoi_polygons") as geos:
+        result = engine._geos_voronoi_regions(points, shapely.box(0, 0, 1, 1))
+
+    assert result is None
+    geos.assert_not_called()
+
+
+def test_boundary_cache_round_trips_and_follows_source(tmp_path, monkeypatch):
+    monkeypatch.setenv("TESSERA_CACHE_DIR", str(tmp_path / "cache"))
+    source = tmp_path / "states.geojson"
+    source.write_text("{}")
+    engine = VoronoiEngine()
+    wgs84 = {"goa": shapely.box(73.6, 14.9, 74.4, 15.8)}
+    projected = {"goa": shapely.box(0, 0, 1, 1)}
+
+    engine._write_boundary_cache("states", str(source), wgs84, projected)
+    cached_wgs84, cached_projected = engine._read_boundary_cache("states", str(source))
+
+    assert cached_wgs84["goa"].equals(wgs84["goa"])
+    assert cached_projected["goa"].equals(projected["goa"])
+    assert (tmp_path / "cache" / "boundaries").is_dir()
+
+    # Changing the source file invalidates the entry
+    source.write_text('{"type": "FeatureCollection"}')
+    assert engine._read_boundary_cache("states", str(source)) is None
+    engine._write_boundary_cache("states", str(source), wgs84, projected)
+    assert len(list((tmp_path / "cache" / "boundaries").iterdir())) == 1
+
+
+@pytest.mark.skipif(shapely.geos_version < (3, 12, 0), reason="coverage_simplify needs GEOS 3.12")
+def test_simplified_cells_still_tile_the_boundary():
+    # Dense sites give many sub-metre edges for the simplification to remove
+    points = np.random.default_rng(0).uniform(0, 60, (3000, 2))
+    bounding_box = shapely.box(0, 0, 60, 60)
+
+    regions = VoronoiEngine()._voronoi_regions(Voronoi(points, qhull_options=QHULL_OPTIONS), bounding_box)
+    cells = [cell for _, cell in regions]
+
+    # No gaps or overlaps between neighbours
+    assert len(cells) == len(points)
+    assert sum(cell.area for cell in cells) == pytest.approx(bounding_box.area)
+    assert shapely.union_all(cells).area == pytest.approx(bounding_box.area)
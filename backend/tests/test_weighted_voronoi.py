@@ -0,0 +1,169 @@
+"""
+Unit tests for the weighted Voronoi engine
+"""
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+import shapely
+from shapely.geometry import Point, box
+
+from app.services.dcel import get_current_dcel
+from app.services.routing_service import RoadDistanceCache, RouteResult
+from app.services.voronoi_engine import VoronoiEngine
+from app.services.weighted_voronoi import (
+    GRID_POINTS_PER_FACILITY, WeightedVoronoiConfig, WeightedVoronoiEngine
+)
+
+FACILITIES = [
+    {"id": "1", "name": "Delhi", "lat": 28.6139, "lng": 77.2090},
+    {"id": "2", "name": "Mumbai", "lat": 19.0760, "lng": 72.8777},
+    {"id": "3", "name": "Chennai", "lat": 13.0827, "lng": 80.2707},
+    {"id": "4", "name": "Kolkata", "lat": 22.5726, "lng": 88.3639},
+]
+
+
+def make_engine():
+    return WeightedVoronoiEngine(routing_service=MagicMock(), distance_cache=MagicMock())
+
+
+def test_euclidean_step_reuses_cells_but_not_state():
+    VoronoiEngine._cells_cache.clear()
+
+    first = make_engine()._compute_euclidean_step(FACILITIES, False, None)
+    with patch.object(VoronoiEngine, "_build_cells") as build:
+        second = make_engine()._compute_euclidean_step(FACILITIES, False, None)
+
+    build.assert_not_called()
+    # Each request gets its own GeoJSON and DCEL
+    assert second[0] is not first[0]
+    assert second[1] is not first[1]
+    assert get_current_dcel() is second[1]
+    assert second[3] == ["1", "2", "3", "4"]
+
+
+def test_road_penalties_skip_cached_pairs(tmp_path):
+    routing = MagicMock()
+    routing.batch_distance_sync.side_effect = lambda lat, lng, dests: [
+        RouteResult((lat, lng), dest, 2000.0, 60.0, True) for dest in dests
+    ]
+    engine = WeightedVoronoiEngine(
+        routing_service=routing,
+        distance_cache=RoadDistanceCache(str(tmp_path / "routes.sqlite"))
+    )
+    index = engine._facility_index(FACILITIES)
+    members = engine._member_positions(index, ["1", "2", "3", "4"])
+    config = WeightedVoronoiConfig(num_neighbor_samples=2, max_table_coordinates=0)
+
+    penalties, queries = engine._compute_road_penalties(index, members, config)
+    again, cached_queries = engine._compute_road_penalties(index, members, config)
+
+    assert queries == 4
+    assert cached_queries == 0
+    assert again == penalties
+    assert all(p > 0 for p in penalties.values())
+
+
+def test_small_penalty_pass_uses_one_table_query(tmp_path):
+    routing = MagicMock()
+    routing.batch_matrix_sync.side_effect = lambda origins, dests: (
+        np.full((len(origins), len(dests)), 2000.0),
+        np.full((len(origins), len(dests)), 60.0),
+    )
+    engine = WeightedVoronoiEngine(
+        routing_service=routing,
+        distance_cache=RoadDistanceCache(str(tmp_path / "routes.sqlite"))
+    )
+    index = engine._facility_index(FACILITIES)
+    members = engine._member_positions(index, ["1", "2", "3", "4"])
+    config = WeightedVoronoiConfig(num_neighbor_samples=2)
+
+    penalties, queries = engine._compute_road_penalties(index, members, config)
+    again, cached_queries = engine._compute_road_penalties(index, members, config)
+
+    assert queries == 1
+    assert routing.batch_matrix_sync.call_count == 1
+    routing.batch_distance_sync.assert_not_called()
+    origins, dests = routing.batch_matrix_sync.call_args.args
+    assert len(origins) == 4
+    assert len(dests) == len(set(dests))
+    assert cached_queries == 0
+    assert again == penalties
+    assert all(p > 0 for p in penalties.values())
+
+
+@pytest.mark.anyio
+async def test_async_penalty_cache_access_runs_off_the_event_loop(tmp_path, anyio_backend):
+    loop_thread = threading.get_ident()
+    cache = RoadDistanceCache(str(tmp_path / "routes.sqlite"))
+    cache_threads = set()
+    get_many, put_many = cache.get_many, cache.put_many
+
+    def tracked(method):
+        def wrapper(*args, **kwargs):
+            cache_threads.add(threading.get_ident())
+            return method(*args, **kwargs)
+        return wrapper
+
+    cache.get_many, cache.put_many = tracked(get_many), tracked(put_many)
+    routing = MagicMock()
+    routing.batch_matrix = AsyncMock(side_effect=lambda origins, dests: (
+        np.full((len(origins), len(dests)), 2000.0),
+        np.full((len(origins), len(dests)), 60.0),
+    ))
+    engine = WeightedVoronoiEngine(routing_service=routing, distance_cache=cache)
+    index = engine._facility_index(FACILITIES)
+    members = engine._member_positions(index, ["1", "2", "3", "4"])
+    config = WeightedVoronoiConfig(num_neighbor_samples=2)
+
+    penalties, queries = await engine._compute_road_penalties_async(index, members, config)
+
+    assert queries == 1
+    assert all(p > 0 for p in penalties.values())
+    assert cache_threads and loop_thread not in cache_threads
+
+
+def test_penalty_neighbors_are_members_only():
+    engine = make_engine()
+    index = engine._facility_index(FACILITIES)
+    # Mumbai is left out, so it can't be anyone's neighbor
+    members = engine._member_positions(index, ["1", "3", "4"])
+
+    samples = engine._penalty_neighbors(index, members, WeightedVoronoiConfig(num_neighbor_samples=5))
+
+    assert [s[0] for s in samples] == ["1", "3", "4"]
+    delhi_neighbors = samples[0][3]
+    assert delhi_neighbors == [(22.5726, 88.3639), (13.0827, 80.2707)]
+
+
+def test_state_filtered_grid_is_sized_for_state_facilities(tmp_path):
+    # A national dataset: a 50x40 lattice of facilities over India
+    national = [
+        {"id": f"f{i}_{j}", "name": f"F{i}_{j}", "lat": 8.0 + 0.7 * j, "lng": 69.0 + 0.55 * i}
+        for i in range(50) for j in range(40)
+    ]
+    state = box(73.6, 14.9, 74.4, 15.8)  # Goa-sized, around a handful of them
+    members = [f for f in national if state.contains(Point(f["lng"], f["lat"]))]
+    assert 0 < len(members) < 10
+
+    routing = MagicMock()
+    routing.batch_matrix_sync.side_effect = lambda origins, dests: (
+        np.arange(len(origins) * len(dests), dtype=float).reshape(len(origins), len(dests)) * 1000,
+        np.full((len(origins), len(dests)), 60.0),
+    )
+    engine = WeightedVoronoiEngine(
+        routing_service=routing,
+        distance_cache=RoadDistanceCache(str(tmp_path / "routes.sqlite"))
+    )
+    step1 = ({"type": "FeatureCollection", "features": []}, None, members, [f["id"] for f in members])
+
+    with patch.object(engine, "_compute_euclidean_step", return_value=step1), \
+            patch.object(engine, "_get_boundary", return_value=state), \
+            patch("app.services.weighted_voronoi.shapely.contains_xy", wraps=shapely.contains_xy) as sampled:
+        engine.compute(national, state_filter="Goa")
+
+    # About GRID_POINTS_PER_FACILITY samples per facility in the state, not
+    # per facility in the dataset (which would hit MAX_GRID_POINTS)
+    grid_points = sampled.call_args.args[1].size
+    assert grid_points <= 2 * len(members) * GRID_POINTS_PER_FACILITY